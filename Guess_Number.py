@@ -1,8 +1,22 @@
 import argparse
+import asyncio
 import logging
+import mmap
+import os
 import random
+import struct
 import sys
-from typing import Optional, List
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Predefined difficulties override bounds/attempts
+DIFFICULTY_SETTINGS: Dict[str, Dict[str, int]] = {
+    'easy':   {'lower': 1,   'upper': 50,  'attempts': 15},
+    'medium': {'lower': 1,   'upper': 100, 'attempts': 10},
+    'hard':   {'lower': 1,   'upper': 200, 'attempts': 5},
+}
 
 
 def parse_args() -> argparse.Namespace:
@@ -43,9 +57,97 @@ def parse_args() -> argparse.Namespace:
         action='store_true',
         help="Enable verbose debug logging."
     )
+    net = parser.add_argument_group('network play')
+    net.add_argument(
+        '--serve',
+        action='store_true',
+        help="Host games for many players over a TCP line protocol."
+    )
+    net.add_argument(
+        '--load-test',
+        type=int,
+        metavar='SESSIONS',
+        help="Play SESSIONS games against a running --serve instance and report throughput."
+    )
+    net.add_argument('--host', default='127.0.0.1', help="Address to serve on / connect to.")
+    net.add_argument('--port', type=int, default=7777, help="TCP port to serve on / connect to.")
+    net.add_argument(
+        '--idle-timeout',
+        type=float,
+        default=300.0,
+        help="Seconds before an inactive session is disconnected (--serve)."
+    )
+    net.add_argument(
+        '--concurrency',
+        type=int,
+        default=500,
+        help="Simultaneous connections opened by --load-test."
+    )
+    hist = parser.add_argument_group('history')
+    hist.add_argument(
+        '--record',
+        metavar='PATH',
+        help="Append every finished round to this binary history log."
+    )
+    hist.add_argument(
+        '--history-report',
+        metavar='PATH',
+        help="Print win rate and attempts per difficulty from a history log."
+    )
+    sim = parser.add_argument_group('simulation')
+    sim.add_argument(
+        '--simulate',
+        type=int,
+        metavar='GAMES',
+        help="Play GAMES headless games per difficulty and strategy and report win rates "
+             "(requires numpy)."
+    )
+    sim.add_argument(
+        '--strategies',
+        nargs='+',
+        choices=sorted(STRATEGIES),
+        default=sorted(STRATEGIES),
+        help="Guessing strategies to simulate."
+    )
+    sim.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help="Worker processes for --simulate (default: one per CPU)."
+    )
+    sim.add_argument(
+        '--batch-size',
+        type=int,
+        default=250_000,
+        help="Games per NumPy batch in --simulate."
+    )
     return parser.parse_args()
 
 
+def parse_guess(text: str, lower_bound: int, upper_bound: int) -> int:
+    """Validate one guess; the ValueError message is what the player is shown."""
+    try:
+        guess = int(text)
+    except ValueError:
+        raise ValueError("Please enter a valid integer.") from None
+    if guess < lower_bound or guess > upper_bound:
+        raise ValueError(f"Guess must be between {lower_bound} and {upper_bound}.")
+    return guess
+
+
+def hint_higher(guess: Any, target: Any) -> Any:
+    """True where the hint is "higher"; works on ints and on numpy arrays."""
+    return guess < target
+
+
+def hint_direction(guess: int, target: int) -> str:
+    return "higher" if hint_higher(guess, target) else "lower"
+
+
+def draw_target(rng: random.Random, lower_bound: int, upper_bound: int) -> int:
+    return rng.randint(lower_bound, upper_bound)
+
+
 class GuessNumberGame:
     def __init__(
         self,
@@ -53,18 +155,18 @@ class GuessNumberGame:
         upper_bound: int = 100,
         max_attempts: int = 10,
         rng: Optional[random.Random] = None,
+        seed: Optional[int] = None,
+        recorder: Optional['HistoryRecorder'] = None,
     ) -> None:
-        # Validate parameters
-        if lower_bound >= upper_bound:
-            raise ValueError("Lower bound must be strictly less than upper bound.")
-        if max_attempts <= 0:
-            raise ValueError("Max attempts must be a positive integer.")
-
+        self.validate_settings(lower_bound, upper_bound, max_attempts)
+        self.seed: Optional[int] = seed
+        self.recorder: Optional['HistoryRecorder'] = recorder
+        self.round: int = 0
         self.lower_bound: int = lower_bound
         self.upper_bound: int = upper_bound
         self.max_attempts: int = max_attempts
         self.rng: random.Random = rng or random.Random()
-        self.target_number: int = self.rng.randint(self.lower_bound, self.upper_bound)
+        self.target_number: int = draw_target(self.rng, self.lower_bound, self.upper_bound)
         self.attempts: List[int] = []
 
         logging.debug(
@@ -72,6 +174,13 @@ class GuessNumberGame:
             self.lower_bound, self.upper_bound, self.max_attempts
         )
 
+    @staticmethod
+    def validate_settings(lower_bound: int, upper_bound: int, max_attempts: int) -> None:
+        if lower_bound >= upper_bound:
+            raise ValueError("Lower bound must be strictly less than upper bound.")
+        if max_attempts <= 0:
+            raise ValueError("Max attempts must be a positive integer.")
+
     def print_welcome(self) -> None:
         print("\n🎲 Welcome to the Number Guessing Game! 🎲")
         print(f"Guess a number between {self.lower_bound} and {self.upper_bound}.")
@@ -81,27 +190,22 @@ class GuessNumberGame:
         while True:
             try:
                 guess_input = input(f"Attempt {attempt}/{self.max_attempts}. Your guess: ")
-                guess = int(guess_input)
-            except ValueError:
-                print("❗ Please enter a valid integer.")
+                guess = parse_guess(guess_input, self.lower_bound, self.upper_bound)
+            except ValueError as e:
+                print(f"❗ {e}")
                 continue
             except (KeyboardInterrupt, EOFError):
                 print("\nExiting game. Goodbye!")
                 sys.exit(0)
 
-            if guess < self.lower_bound or guess > self.upper_bound:
-                print(f"❗ Guess must be between {self.lower_bound} and {self.upper_bound}.")
-                continue
-
             logging.debug("User guessed: %d", guess)
             return guess
 
+    def hint_direction(self, guess: int) -> str:
+        return hint_direction(guess, self.target_number)
+
     def provide_hint(self, guess: int) -> None:
-        if guess < self.target_number:
-            direction = "higher"
-        else:
-            direction = "lower"
-        print(f"❌ Wrong. Try a {direction} number.")
+        print(f"❌ Wrong. Try a {self.hint_direction(guess)} number.")
 
     def play(self) -> None:
         self.print_welcome()
@@ -117,15 +221,428 @@ class GuessNumberGame:
         else:
             print(f"\n☹️ Out of attempts! The correct number was {self.target_number}.")
 
+        if self.recorder is not None:
+            self.recorder.record(self, won=self.attempts[-1] == self.target_number)
+
         print("\nYour guesses: ", ", ".join(map(str, self.attempts)))
 
     def reset(self) -> None:
         """Reset the game for another round without recreating the object."""
-        self.target_number = self.rng.randint(self.lower_bound, self.upper_bound)
+        self.target_number = draw_target(self.rng, self.lower_bound, self.upper_bound)
         self.attempts.clear()
+        self.round += 1
         logging.debug("Game reset for new round with new target %d", self.target_number)
 
 
+# --- Binary round history ---
+# File: 8-byte header (magic, version, guess slots), then one 96-byte
+# little-endian record per round:
+#   seed q (-1 = unseeded) | round I | lower i | upper i | target i
+#   | max_attempts H | guesses made H | won B | 3 pad | guesses 16i
+# Rounds with more than 16 guesses keep the true count but only the
+# first 16 guesses.
+HISTORY_MAGIC = b'GNHL'
+HISTORY_VERSION = 1
+HISTORY_GUESS_SLOTS = 16
+HISTORY_HEADER = struct.Struct('<4sHH')
+HISTORY_RECORD = struct.Struct(f'<qIiiiHHB3x{HISTORY_GUESS_SLOTS}i')
+
+
+def _history_dtype() -> Any:
+    import numpy as np
+
+    return np.dtype([
+        ('seed', '<i8'), ('round', '<u4'), ('lower', '<i4'), ('upper', '<i4'),
+        ('target', '<i4'), ('max_attempts', '<u2'), ('guesses', '<u2'), ('won', 'u1'),
+        ('pad', 'V3'), ('values', '<i4', (HISTORY_GUESS_SLOTS,)),
+    ])
+
+
+class HistoryRecorder:
+    """Appends finished rounds to a history log through a buffered file."""
+
+    def __init__(self, path: str, buffer_size: int = 1 << 16) -> None:
+        self.path = path
+        self._fh = open(path, 'ab', buffering=buffer_size)
+        if self._fh.tell() == 0:
+            self._fh.write(HISTORY_HEADER.pack(HISTORY_MAGIC, HISTORY_VERSION, HISTORY_GUESS_SLOTS))
+        self._slots = array('i', bytes(4 * HISTORY_GUESS_SLOTS))
+
+    def record(self, game: 'GuessNumberGame', won: bool) -> None:
+        guesses = game.attempts[:HISTORY_GUESS_SLOTS]
+        slots = self._slots
+        slots[:len(guesses)] = array('i', guesses)
+        slots[len(guesses):] = array('i', bytes(4 * (HISTORY_GUESS_SLOTS - len(guesses))))
+        self._fh.write(HISTORY_RECORD.pack(
+            -1 if game.seed is None else game.seed, game.round,
+            game.lower_bound, game.upper_bound, game.target_number,
+            game.max_attempts, len(game.attempts), won, *slots,
+        ))
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def _difficulty_of(lower: int, upper: int, max_attempts: int) -> str:
+    for name, params in DIFFICULTY_SETTINGS.items():
+        if (params['lower'], params['upper'], params['attempts']) == (lower, upper, max_attempts):
+            return name
+    return 'custom'
+
+
+def history_report(path: str) -> List[Dict[str, Any]]:
+    """Win rate and attempts per difficulty, read straight from the mapped file.
+
+    ``mean_attempts_won`` averages won rounds only; ``mean_attempts_all``
+    averages every round, lost ones included.
+
+    With NumPy the records are viewed in place as a structured array; without
+    it they are walked with ``struct.iter_unpack``.
+    """
+    # difficulty -> [rounds, wins, attempts on wins, attempts on all rounds]
+    totals: Dict[str, List[int]] = {}
+    with open(path, 'rb') as fh:
+        if os.fstat(fh.fileno()).st_size < HISTORY_HEADER.size:
+            return []
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, slots = HISTORY_HEADER.unpack_from(mm)
+            if magic != HISTORY_MAGIC or version != HISTORY_VERSION or slots != HISTORY_GUESS_SLOTS:
+                raise ValueError(f"{path} is not a version {HISTORY_VERSION} history log")
+            count = (len(mm) - HISTORY_HEADER.size) // HISTORY_RECORD.size
+            try:
+                import numpy as np
+            except ImportError:
+                np = None
+            if np is not None:
+                rec = np.frombuffer(mm, dtype=_history_dtype(), count=count, offset=HISTORY_HEADER.size)
+                won = rec['won'].astype(bool)
+                rest = np.ones(count, dtype=bool)
+                masks = []
+                for name, params in DIFFICULTY_SETTINGS.items():
+                    mask = ((rec['lower'] == params['lower']) & (rec['upper'] == params['upper'])
+                            & (rec['max_attempts'] == params['attempts']))
+                    masks.append((name, mask))
+                    rest &= ~mask
+                masks.append(('custom', rest))
+                for name, mask in masks:
+                    n = int(np.count_nonzero(mask))
+                    if n:
+                        hits = mask & won
+                        totals[name] = [n, int(np.count_nonzero(hits)),
+                                        int(rec['guesses'][hits].sum(dtype=np.int64)),
+                                        int(rec['guesses'][mask].sum(dtype=np.int64))]
+                del rec, won, rest, masks  # release the buffer before the map closes
+            else:
+                body = memoryview(mm)[HISTORY_HEADER.size:HISTORY_HEADER.size + count * HISTORY_RECORD.size]
+                for _, _, lower, upper, _, max_att, guesses, won, *_ in HISTORY_RECORD.iter_unpack(body):
+                    acc = totals.setdefault(_difficulty_of(lower, upper, max_att), [0, 0, 0, 0])
+                    acc[0] += 1
+                    acc[3] += guesses
+                    if won:
+                        acc[1] += 1
+                        acc[2] += guesses
+                body.release()
+    return [
+        {
+            'difficulty': name,
+            'rounds': n,
+            'win_rate': w / n if n else 0.0,
+            'mean_attempts_won': t / w if w else None,
+            'mean_attempts_all': t_all / n if n else None,
+        }
+        for name, (n, w, t, t_all) in totals.items()
+    ]
+
+
+# --- Headless simulation ---
+# A strategy maps the still-possible range of each game (inclusive lo/hi
+# arrays, narrowed by the same higher/lower hints a player gets) to the
+# next guesses.
+def _bisection(lo: Any, hi: Any, rng: Any) -> Any:
+    return (lo + hi) // 2
+
+
+def _random_guess(lo: Any, hi: Any, rng: Any) -> Any:
+    return rng.integers(lo, hi + 1)
+
+
+def _biased(lo: Any, hi: Any, rng: Any) -> Any:
+    # Leans towards the low end of the range, like a cautious player.
+    return lo + (hi - lo) // 4
+
+
+STRATEGIES: Dict[str, Callable[[Any, Any, Any], Any]] = {
+    'bisection': _bisection,
+    'random': _random_guess,
+    'biased': _biased,
+}
+
+
+def _require_numpy() -> Any:
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("the simulator needs numpy; install it with 'pip install numpy'") from None
+    return np
+
+
+def simulate_batch(job: Tuple[str, int, int, int, int, int]) -> List[int]:
+    """Play ``games`` games at once; returns wins per attempt number (index 0 = lost)."""
+    np = _require_numpy()
+
+    strategy, lower, upper, max_attempts, games, seed = job
+    rng = np.random.default_rng(seed)
+    guess_fn = STRATEGIES[strategy]
+    targets = rng.integers(lower, upper + 1, size=games)
+    lo = np.full(games, lower, dtype=np.int64)
+    hi = np.full(games, upper, dtype=np.int64)
+    solved_at = np.zeros(games, dtype=np.int64)
+    active = np.ones(games, dtype=bool)
+    for attempt in range(1, max_attempts + 1):
+        guess = guess_fn(lo, hi, rng)
+        hit = active & (guess == targets)
+        solved_at[hit] = attempt
+        active &= ~hit
+        if not active.any():
+            break
+        higher = active & hint_higher(guess, targets)
+        lo = np.where(higher, guess + 1, lo)
+        hi = np.where(active & ~higher, guess - 1, hi)
+    return np.bincount(solved_at, minlength=max_attempts + 1).tolist()
+
+
+def simulate(
+    games: int,
+    difficulties: Iterable[str],
+    strategies: Iterable[str],
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    batch_size: int = 250_000,
+) -> List[Dict[str, Any]]:
+    """Run ``games`` games per difficulty and strategy across a process pool.
+
+    Batch seeds are drawn from ``random.Random(seed)``, so a given seed,
+    game count and batch size always reproduce the same report.
+    """
+    _require_numpy()
+    rng = random.Random(seed)
+    jobs = []
+    for difficulty in difficulties:
+        params = DIFFICULTY_SETTINGS[difficulty]
+        GuessNumberGame.validate_settings(params['lower'], params['upper'], params['attempts'])
+        for strategy in strategies:
+            for start in range(0, games, batch_size):
+                jobs.append(((difficulty, strategy),
+                             (strategy, params['lower'], params['upper'], params['attempts'],
+                              min(batch_size, games - start), rng.getrandbits(63))))
+    counts: Dict[Tuple[str, str], List[int]] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (key, _), hist in zip(jobs, pool.map(simulate_batch, [job for _, job in jobs])):
+            total = counts.setdefault(key, [0] * len(hist))
+            for i, n in enumerate(hist):
+                total[i] += n
+
+    report = []
+    for (difficulty, strategy), hist in counts.items():
+        played = sum(hist)
+        wins = played - hist[0]
+        tries_won = sum(i * n for i, n in enumerate(hist))
+        # A lost game used every attempt (index 0 of the histogram).
+        tries_all = tries_won + hist[0] * (len(hist) - 1)
+        report.append({
+            'difficulty': difficulty,
+            'strategy': strategy,
+            'games': played,
+            'win_rate': wins / played if played else 0.0,
+            'mean_attempts_won': tries_won / wins if wins else None,
+            'mean_attempts_all': tries_all / played if played else None,
+            'attempts': {i: n / played for i, n in enumerate(hist) if i and n},
+        })
+    return report
+
+
+def _fmt_mean(value: Optional[float]) -> str:
+    return f"{value:.2f}" if value is not None else '-'
+
+
+def print_simulation(report: List[Dict[str, Any]], elapsed: float) -> None:
+    total = sum(r['games'] for r in report)
+    print(f"{total:,} games in {elapsed:.2f}s ({total / elapsed:,.0f} games/s)\n")
+    print(f"{'Difficulty':<10} {'Strategy':<10} {'Games':>12} {'Win %':>7} {'Tries/win':>9} {'Tries/all':>9}")
+    for r in report:
+        print(f"{r['difficulty']:<10} {r['strategy']:<10} {r['games']:>12,} "
+              f"{r['win_rate'] * 100:>6.2f}% {_fmt_mean(r['mean_attempts_won']):>9} "
+              f"{_fmt_mean(r['mean_attempts_all']):>9}")
+    print("\nWins by attempt (% of games):")
+    for r in report:
+        dist = ' '.join(f"{i}:{p * 100:.1f}" for i, p in r['attempts'].items())
+        print(f"  {r['difficulty']:<6} {r['strategy']:<10} {dist}")
+
+
+# --- Network play: asyncio line-protocol server and load generator ---
+# Server -> client: NEW <lower> <upper> <attempts> | HIGHER <left> | LOWER <left>
+#                   | WIN <attempts> | LOSE <target> | ERR <message> | BYE
+# Client -> server: <integer guess> | NEW | QUIT
+class GuessSession:
+    """Per-connection game state, kept small so thousands fit in one process.
+
+    Bounds and attempts are shared settings; the server's single
+    ``random.Random`` draws every target.
+    """
+    __slots__ = ('lower_bound', 'upper_bound', 'max_attempts', 'target_number',
+                 'attempt', 'last_seen', 'writer')
+
+    def __init__(self, lower_bound: int, upper_bound: int, max_attempts: int,
+                 rng: random.Random, writer: Any) -> None:
+        self.lower_bound = lower_bound
+        self.upper_bound = upper_bound
+        self.max_attempts = max_attempts
+        self.writer = writer
+        self.reset(rng)
+
+    def reset(self, rng: random.Random) -> str:
+        self.target_number = draw_target(rng, self.lower_bound, self.upper_bound)
+        self.attempt = 0
+        self.last_seen = time.monotonic()
+        return f"NEW {self.lower_bound} {self.upper_bound} {self.max_attempts}"
+
+    def handle(self, line: str, rng: random.Random) -> List[str]:
+        """Apply one client line; returns the reply lines."""
+        self.last_seen = time.monotonic()
+        command = line.strip().upper()
+        if command == 'QUIT':
+            return ['BYE']
+        if command == 'NEW':
+            return [self.reset(rng)]
+        try:
+            guess = parse_guess(line, self.lower_bound, self.upper_bound)
+        except ValueError as e:
+            return [f"ERR {e}"]
+        self.attempt += 1
+        if guess == self.target_number:
+            return [f"WIN {self.attempt}", self.reset(rng)]
+        if self.attempt >= self.max_attempts:
+            return [f"LOSE {self.target_number}", self.reset(rng)]
+        left = self.max_attempts - self.attempt
+        return [f"{hint_direction(guess, self.target_number).upper()} {left}"]
+
+
+def _raise_fd_limit() -> None:
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def serve(host: str, port: int, lower: int, upper: int, max_attempts: int,
+                rng: random.Random, idle_timeout: float = 300.0) -> None:
+    GuessNumberGame.validate_settings(lower, upper, max_attempts)
+    sessions: Dict[int, GuessSession] = {}
+
+    async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = GuessSession(lower, upper, max_attempts, rng, writer)
+        sessions[id(session)] = session
+        writer.write(f"NEW {lower} {upper} {max_attempts}\n".encode())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                replies = session.handle(line.decode(errors='replace'), rng)
+                writer.write(('\n'.join(replies) + '\n').encode())
+                if replies[0] == 'BYE':
+                    break
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            sessions.pop(id(session), None)
+            writer.close()
+
+    async def evict_idle() -> None:
+        while True:
+            await asyncio.sleep(min(idle_timeout, 30.0))
+            cutoff = time.monotonic() - idle_timeout
+            idle = [s for s in sessions.values() if s.last_seen < cutoff]
+            for s in idle:
+                s.writer.close()
+            logging.info("Sessions: %d active, %d evicted as idle", len(sessions) - len(idle), len(idle))
+
+    _raise_fd_limit()
+    server = await asyncio.start_server(handle_client, host, port, limit=256, backlog=4096)
+    logging.info("Serving on %s:%d (range [%d, %d], %d attempts)", host, port, lower, upper, max_attempts)
+    sweeper = asyncio.create_task(evict_idle())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        sweeper.cancel()
+
+
+async def _play_remote(host: str, port: int, latencies: List[float]) -> bool:
+    """Play one game by bisection over the wire; True when it was won."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, lower, upper, _ = (await reader.readline()).split()
+        lo, hi = int(lower), int(upper)
+        while True:
+            guess = (lo + hi) // 2
+            start = time.perf_counter()
+            writer.write(f"{guess}\n".encode())
+            reply = (await reader.readline()).decode().split()
+            if not reply:
+                raise ValueError("server closed the session")
+            latencies.append(time.perf_counter() - start)
+            if reply[0] == 'HIGHER':
+                lo = guess + 1
+            elif reply[0] == 'LOWER':
+                hi = guess - 1
+            else:
+                writer.write(b"QUIT\n")
+                return reply[0] == 'WIN'
+    finally:
+        writer.close()
+
+
+async def load_test(host: str, port: int, sessions: int, concurrency: int = 500) -> Dict[str, Any]:
+    """Run ``sessions`` games with at most ``concurrency`` connections open.
+
+    A session whose connection fails or whose server reply is empty or
+    malformed counts as failed and is left out of ``sessions_per_s``.
+    """
+    _raise_fd_limit()
+    latencies: List[float] = []
+    gate = asyncio.Semaphore(concurrency)
+    results = {'won': 0, 'lost': 0, 'failed': 0}
+
+    async def one() -> None:
+        async with gate:
+            try:
+                results['won' if await _play_remote(host, port, latencies) else 'lost'] += 1
+            except (OSError, IndexError, ValueError):
+                results['failed'] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def pct(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        **results,
+        'seconds': elapsed,
+        # Completed sessions only; failures are reported on their own.
+        'sessions_per_s': (results['won'] + results['lost']) / elapsed if elapsed else 0.0,
+        'guesses': len(latencies),
+        'p50_ms': pct(0.50),
+        'p99_ms': pct(0.99),
+    }
+
+
 def main() -> None:
     args = parse_args()
 
@@ -137,39 +654,87 @@ def main() -> None:
         datefmt="%H:%M:%S",
     )
 
-    # Predefined difficulties override bounds/attempts
-    difficulty_settings = {
-        'easy':   {'lower': 1,   'upper': 50,  'attempts': 15},
-        'medium': {'lower': 1,   'upper': 100, 'attempts': 10},
-        'hard':   {'lower': 1,   'upper': 200, 'attempts': 5},
-    }
+    if args.simulate:
+        start = time.perf_counter()
+        try:
+            report = simulate(
+                args.simulate,
+                [args.difficulty] if args.difficulty else list(DIFFICULTY_SETTINGS),
+                args.strategies,
+                seed=args.seed,
+                workers=args.workers,
+                batch_size=args.batch_size,
+            )
+        except ImportError as e:
+            logging.error(str(e))
+            sys.exit(1)
+        print_simulation(report, time.perf_counter() - start)
+        return
+
+    if args.history_report:
+        try:
+            report = history_report(args.history_report)
+        except (OSError, ValueError) as e:
+            logging.error(str(e))
+            sys.exit(1)
+        print(f"{'Difficulty':<10} {'Rounds':>12} {'Win %':>7} {'Tries/win':>9} {'Tries/all':>9}")
+        for r in report:
+            print(f"{r['difficulty']:<10} {r['rounds']:>12,} {r['win_rate'] * 100:>6.2f}% "
+                  f"{_fmt_mean(r['mean_attempts_won']):>9} {_fmt_mean(r['mean_attempts_all']):>9}")
+        return
+
+    if args.load_test:
+        res = asyncio.run(load_test(args.host, args.port, args.load_test, args.concurrency))
+        print(f"{args.load_test:,} sessions in {res['seconds']:.2f}s "
+              f"({res['sessions_per_s']:,.0f} completed/s): "
+              f"{res['won']} won, {res['lost']} lost, {res['failed']} failed")
+        print(f"{res['guesses']:,} guesses, latency p50 {res['p50_ms']:.2f} ms, "
+              f"p99 {res['p99_ms']:.2f} ms")
+        return
+
     if args.difficulty:
-        params = difficulty_settings[args.difficulty]
+        params = DIFFICULTY_SETTINGS[args.difficulty]
         lower, upper, max_att = params['lower'], params['upper'], params['attempts']
     else:
         lower, upper, max_att = args.lower, args.upper, args.attempts
 
     rng = random.Random(args.seed) if args.seed is not None else None
+    if args.serve:
+        try:
+            asyncio.run(serve(args.host, args.port, lower, upper, max_att,
+                              rng or random.Random(), args.idle_timeout))
+        except ValueError as e:
+            logging.error(str(e))
+            sys.exit(1)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    recorder = HistoryRecorder(args.record) if args.record else None
     try:
-        game = GuessNumberGame(lower, upper, max_att, rng)
+        game = GuessNumberGame(lower, upper, max_att, rng, seed=args.seed, recorder=recorder)
     except ValueError as e:
         logging.error(str(e))
         sys.exit(1)
 
-    while True:
-        game.play()
-        try:
-            again = input("\nWould you like to play again? (y/n): ").strip().lower()
-        except (KeyboardInterrupt, EOFError):
-            print("\nExiting. Thanks for playing!")
-            break
+    try:
+        while True:
+            game.play()
+            try:
+                again = input("\nWould you like to play again? (y/n): ").strip().lower()
+            except (KeyboardInterrupt, EOFError):
+                print("\nExiting. Thanks for playing!")
+                break
 
-        if again in ('y', 'yes'):
-            game.reset()
-            print()
-            continue
-        print("Goodbye!")
-        break
+            if again in ('y', 'yes'):
+                game.reset()
+                print()
+                continue
+            print("Goodbye!")
+            break
+    finally:
+        if recorder is not None:
+            recorder.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Benchmark the Scoreboard data paths in game.py against a local MySQL/MariaDB.
+
+By default a throwaway server is initialised in a temporary directory and
+started with ``--skip-networking`` (Unix socket only); ``--socket`` points the
+run at an already running local instance instead. Results are written as
+JSON so two commits can be compared with ``--compare``.
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import game
+from game import Game, Scoreboard, TABLE_MAP
+
+SCORE_DDL = ("CREATE TABLE IF NOT EXISTS `{table}` (Name varchar(20) NOT NULL, "
+             "Score int NOT NULL, Code varchar(3) NOT NULL)")
+EXTRA_DDL = [
+    "CREATE TABLE IF NOT EXISTS `Logs` (Name varchar(10) NOT NULL, Score int NOT NULL, "
+    "Logdate datetime NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS `Services` (Name varchar(20) NOT NULL, "
+    "Status varchar(20) NOT NULL, Restart varchar(3) NOT NULL)",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Time add_score, bulk insert, show_scores(ALL), update_score, "
+                    "get_players and log_and_clear as the game tables grow."
+    )
+    parser.add_argument('--socket', help="Use a running server on this Unix socket.")
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--database', default='game_bench')
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+        help="Rows seeded into each of UNO/CHESS/CARROM per round."
+    )
+    parser.add_argument('--ops', type=int, default=500, help="Timed calls per point operation.")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for player selection.")
+    parser.add_argument('--migrated', action='store_true',
+                        help="Run game.migrate_schema() after seeding (unique names + indexes).")
+    parser.add_argument('--output', help="Result file (default: bench_results/<commit>.json).")
+    parser.add_argument('--compare', help="Earlier result file to compare against.")
+    return parser.parse_args()
+
+
+# --- Throwaway local server ---
+def _which(*names: str) -> Optional[str]:
+    for name in names:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+@contextlib.contextmanager
+def local_server() -> Iterator[str]:
+    """Initialise and start a private mysqld/mariadbd; yields its socket path."""
+    server = _which('mariadbd', 'mysqld')
+    if server is None:
+        raise RuntimeError("No mariadbd/mysqld binary on PATH; pass --socket instead.")
+    tmp = tempfile.mkdtemp(prefix='game-bench-')
+    datadir, sock = os.path.join(tmp, 'data'), os.path.join(tmp, 'mysql.sock')
+    as_root = ['--user=root'] if hasattr(os, 'geteuid') and os.geteuid() == 0 else []
+    installer = _which('mariadb-install-db', 'mysql_install_db')
+    if installer and os.path.basename(server) == 'mariadbd':
+        init = [installer, '--no-defaults', f'--datadir={datadir}',
+                '--auth-root-authentication-method=normal', '--skip-test-db', *as_root]
+    else:
+        init = [server, '--no-defaults', '--initialize-insecure', f'--datadir={datadir}', *as_root]
+    subprocess.run(init, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    proc = subprocess.Popen(
+        [server, '--no-defaults', f'--datadir={datadir}', f'--socket={sock}',
+         f'--pid-file={os.path.join(tmp, "mysqld.pid")}', '--skip-networking',
+         '--skip-log-bin', '--innodb-buffer-pool-size=256M', *as_root],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        import mysql.connector
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                mysql.connector.connect(unix_socket=sock, user='root').close()
+                break
+            except mysql.connector.Error:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("Local server did not start")
+                time.sleep(0.25)
+        yield sock
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def prepare_database(sock: str, user: str, password: str, database: str) -> None:
+    import mysql.connector
+    conn = mysql.connector.connect(unix_socket=sock, user=user, password=password)
+    cur = conn.cursor()
+    cur.execute(f"DROP DATABASE IF EXISTS `{database}`")
+    cur.execute(f"CREATE DATABASE `{database}`")
+    cur.execute(f"USE `{database}`")
+    for table in TABLE_MAP.values():
+        cur.execute(SCORE_DDL.format(table=table))
+    for ddl in EXTRA_DDL:
+        cur.execute(ddl)
+    conn.commit()
+    conn.close()
+
+
+# --- Measurement helpers ---
+def summarize(name: str, timings: List[float], units: int) -> Dict[str, Any]:
+    """p50/p99 per call in ms and throughput in units (rows or calls) per second."""
+    timings = sorted(timings)
+    total = sum(timings)
+    return {
+        'op': name,
+        'calls': len(timings),
+        'p50_ms': round(game._percentile(timings, 0.50) * 1000, 3),
+        'p99_ms': round(game._percentile(timings, 0.99) * 1000, 3),
+        'throughput_per_s': round(units / total, 1) if total else None,
+    }
+
+
+def time_calls(fn: Callable[[], Any], n: int) -> List[float]:
+    out = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - start)
+    return out
+
+
+def seed_tables(size: int, chunk: int = 5000) -> Dict[str, Any]:
+    timings = []
+    for table in TABLE_MAP.values():
+        with game.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"TRUNCATE TABLE `{table}`")
+            conn.commit()
+        for lo in range(0, size, chunk):
+            rows = [(f"p{i:07d}", i % 1000, 'P') for i in range(lo, min(size, lo + chunk))]
+            start = time.perf_counter()
+            game.bulk_insert(table, rows)
+            timings.append(time.perf_counter() - start)
+    return summarize('_async_bulk_insert', timings, size * len(TABLE_MAP))
+
+
+def run_round(size: int, ops: int, rng: random.Random, migrated: bool) -> List[Dict[str, Any]]:
+    results = [seed_tables(size)]
+    if migrated:
+        game.migrate_schema(probe=False)
+    sb = Scoreboard()
+    picks = iter([f"p{rng.randrange(size):07d}" for _ in range(ops)])
+
+    # New names for add_score so a unique key (when migrated) never rejects them.
+    fresh = iter(f"n{i:07d}" for i in range(ops))
+    results.append(summarize('add_score', time_calls(
+        lambda: sb.add_score(Game.UNO, next(fresh), 1), ops), ops))
+    results.append(summarize('update_score', time_calls(
+        lambda: sb.update_score(Game.UNO, next(picks), 1), ops), ops))
+
+    def players() -> None:
+        sb._player_cache.invalidate(Game.UNO)
+        sb.get_players(Game.UNO)
+    reps = max(3, min(20, 2_000_000 // max(size, 1)))
+    results.append(summarize('get_players', time_calls(players, reps), reps))
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        reps = max(3, min(10, 1_000_000 // max(size, 1)))
+        timings = time_calls(lambda: sb.show_scores(Game.ALL), reps)
+    results.append(summarize('show_scores(ALL)', timings, reps * size * len(TABLE_MAP)))
+
+    results.append(summarize('log_and_clear', time_calls(
+        lambda: sb.log_and_clear(Game.UNO), 1), size))
+    for r in results:
+        r['rows'] = size
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any]) -> List[tuple]:
+    old = {(r['rows'], r['op']): r for r in base['results']}
+    rows = []
+    for r in new['results']:
+        b = old.get((r['rows'], r['op']))
+        if not b or not b['p50_ms']:
+            continue
+        rows.append((r['rows'], r['op'], b['p50_ms'], r['p50_ms'],
+                     f"{(r['p50_ms'] - b['p50_ms']) / b['p50_ms'] * 100:+.1f}%"))
+    return rows
+
+
+def main() -> None:
+    args = parse_args()
+    game.setup_logging()
+    rng = random.Random(args.seed)
+    with contextlib.ExitStack() as stack:
+        sock = args.socket or stack.enter_context(local_server())
+        prepare_database(sock, args.user, args.password, args.database)
+        game.init_db_pool('localhost', 3306, args.user, args.password, args.database,
+                          unix_socket=sock)
+        results = []
+        for size in args.sizes:
+            results.extend(run_round(size, args.ops, rng, args.migrated))
+            print(f"done: {size} rows", file=sys.stderr)
+        game.run_shutdown_hooks()
+
+    report = {
+        'commit': git_commit(),
+        'at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'migrated': args.migrated,
+        'results': results,
+    }
+    out = args.output or os.path.join('bench_results', f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, indent=2)
+
+    game.rich_print_table(
+        ['Rows', 'Op', 'Calls', 'p50 ms', 'p99 ms', 'Throughput/s'],
+        [(r['rows'], r['op'], r['calls'], r['p50_ms'], r['p99_ms'], r['throughput_per_s'])
+         for r in results],
+        title=f"Scoreboard benchmark ({report['commit']})"
+    )
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fh:
+            base = json.load(fh)
+        game.rich_print_table(['Rows', 'Op', 'Base p50', 'New p50', 'Change'],
+                              compare(base, report), title=f"vs {base.get('commit')}")
+    print(f"Saved {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+import argparse
 import sys
 import re
 import getpass
@@ -7,35 +8,132 @@ import shutil
 import subprocess
 import logging
 import signal
-import asyncio
-from logging.handlers import RotatingFileHandler
+import csv
+import gzip
+import json
+import time
+import threading
+import random
+from abc import ABC, abstractmethod
+from queue import SimpleQueue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from datetime import date, datetime, timedelta
 from enum import Enum
 from contextlib import contextmanager
-from functools import wraps
-from typing import Any, Callable, Dict, List, Optional
-
-import mysql.connector
-from mysql.connector import pooling
-import aiomysql
-from pythonjsonlogger import jsonlogger
-from prompt_toolkit import PromptSession
-from prompt_toolkit.completion import WordCompleter
-from rich.console import Console
-from rich.table import Table
-
-# --- Setup console for Rich ---
-console = Console()
-
-# --- Logging Setup: Rotating and JSON-formatted ---
+from functools import lru_cache, wraps
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, OrderedDict
+from operator import itemgetter
+from itertools import chain, islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import (Any, Awaitable, Callable, Dict, IO, Iterable, Iterator,
+                    List, NamedTuple, Optional, Sequence, Tuple, Union)
+
+# Heavy third-party modules (mysql.connector, aiomysql, pythonjsonlogger,
+# prompt_toolkit, rich) are imported inside the functions that use them, so a
+# subcommand only pays for what it touches. Check with: game.py startup-cost
+
+# --- Setup console for Rich (created on first use) ---
+class _LazyConsole:
+    _console: Any = None
+
+    def __getattr__(self, name: str) -> Any:
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console()
+        return getattr(_LazyConsole._console, name)
+
+console = _LazyConsole()
+
+# --- Logging Setup: Rotating and JSON-formatted, written by a background listener ---
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
-ch = logging.StreamHandler(sys.stdout)
-fh = RotatingFileHandler('game.log', maxBytes=5 * 1024 * 1024, backupCount=3)
-formatter = jsonlogger.JsonFormatter('%(asctime)s %(levelname)s %(name)s %(message)s')
-ch.setFormatter(formatter)
-fh.setFormatter(formatter)
-logger.addHandler(ch)
-logger.addHandler(fh)
+_log_listener: Optional[QueueListener] = None
+
+# High-volume events are rate limited by default: message -> (events/sec, burst).
+DEFAULT_LOG_RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+    'Added score':    (100.0, 200.0),
+    'Updated score':  (100.0, 200.0),
+    'Upserted score': (100.0, 200.0),
+}
+
+def _parse_log_rules(spec: str) -> Dict[str, float]:
+    """Parse ``"Added score=0.1,Updated score=0.5"`` into {message: value}."""
+    rules: Dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        msg, _, value = part.rpartition('=')
+        rules[msg.strip()] = float(value)
+    return rules
+
+class LogSampler(logging.Filter):
+    """Per-message sampling and token-bucket rate limiting.
+
+    Records are keyed by their unformatted message, so every "Added score"
+    shares a budget regardless of its extra fields. WARNING and above always
+    pass. The next record let through after drops carries ``suppressed``,
+    the number dropped since the previous one.
+    """
+
+    def __init__(self, sample: Dict[str, float], limits: Dict[str, Tuple[float, float]]):
+        super().__init__()
+        self._sample = sample
+        self._limits = limits
+        self._buckets: Dict[str, List[float]] = {}
+        self._dropped: Counter = Counter()
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = str(record.msg)
+        keep = True
+        with self._lock:
+            ratio = self._sample.get(key)
+            if ratio is not None and self._rng.random() >= ratio:
+                keep = False
+            limit = self._limits.get(key)
+            if keep and limit is not None:
+                rate, burst = limit
+                now = time.monotonic()
+                tokens, last = self._buckets.get(key, (burst, now))
+                tokens = min(burst, tokens + (now - last) * rate)
+                keep = tokens >= 1.0
+                self._buckets[key] = [tokens - 1.0 if keep else tokens, now]
+            if not keep:
+                self._dropped[key] += 1
+                return False
+            dropped = self._dropped.pop(key, 0)
+        if dropped:
+            record.suppressed = dropped
+        return True
+
+def setup_logging() -> None:
+    """Attach a QueueHandler; JSON formatting and file I/O run on a listener thread."""
+    global _log_listener
+    from pythonjsonlogger import jsonlogger
+    ch = logging.StreamHandler(sys.stdout)
+    fh = RotatingFileHandler('game.log', maxBytes=5 * 1024 * 1024, backupCount=3)
+    formatter = jsonlogger.JsonFormatter('%(asctime)s %(levelname)s %(name)s %(message)s')
+    ch.setFormatter(formatter)
+    fh.setFormatter(formatter)
+
+    limits = dict(DEFAULT_LOG_RATE_LIMITS)
+    for msg, rate in _parse_log_rules(os.getenv('LOG_RATE_LIMIT', '')).items():
+        limits[msg] = (rate, max(rate, 1.0))
+    qh = QueueHandler(SimpleQueue())
+    qh.addFilter(LogSampler(_parse_log_rules(os.getenv('LOG_SAMPLE', '')), limits))
+    logger.addHandler(qh)
+    _log_listener = QueueListener(qh.queue, ch, fh, respect_handler_level=True)
+    _log_listener.start()
+    register_shutdown_hook(stop_logging)
+
+def stop_logging() -> None:
+    """Drain queued records to the handlers and stop the listener thread."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
 
 # --- Enums ---
 class Game(Enum):
@@ -44,6 +142,12 @@ class Game(Enum):
     CHESS  = 2
     CARROM = 3
 
+class RegisteredGame(NamedTuple):
+    """A game listed in the registry table rather than in the ``Game`` enum."""
+    name: str
+
+GameKey = Union[Game, RegisteredGame]
+
 class ServiceAction(Enum):
     START   = 'start'
     STOP    = 'stop'
@@ -51,7 +155,9 @@ class ServiceAction(Enum):
     STATUS  = 'status'
 
 # --- Table configuration & validation ---
-TABLE_MAP: Dict[Game, str] = {
+# Built-in games come from TABLE_* env vars; load_game_registry() adds or
+# overrides entries from the registry table at startup.
+TABLE_MAP: Dict[GameKey, str] = {
     Game.UNO:    os.getenv('TABLE_UNO', 'UNO'),
     Game.CHESS:  os.getenv('TABLE_CHESS', 'CHESS'),
     Game.CARROM: os.getenv('TABLE_CARROM', 'CARROM'),
@@ -61,104 +167,2015 @@ for tbl in TABLE_MAP.values():
     if not _table_pattern.match(tbl):
         logger.error('Invalid table name in TABLE_MAP: %s', tbl)
         sys.exit(1)
+GAME_REGISTRY_TABLE = os.getenv('GAME_REGISTRY_TABLE', 'GameRegistry')
+# Cap on concurrent per-table work for ALL-style operations.
+FANOUT_LIMIT = max(1, int(os.getenv('GAME_FANOUT', '5')))
+
+# --- Metrics: counters, gauges and latency histograms ---
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+class Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation."""
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float('inf')
+        return 0.0
+
+class Metrics:
+    """In-process registry; every update is a dict lookup and an add under one lock."""
+
+    def __init__(self, prefix: str = 'game'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._gauges: Dict[Tuple[str, Tuple], float] = {}
+        self._hists: Dict[Tuple[str, Tuple], Histogram] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def add_gauge(self, name: str, delta: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0.0) + delta
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._hists.get(key)
+            if hist is None:
+                hist = self._hists[key] = Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def summary(self) -> List[tuple]:
+        """(metric, labels, count, mean ms, p50 ms, p99 ms) per histogram, then counters."""
+        with self._lock:
+            rows = []
+            for (name, labels), h in sorted(self._hists.items()):
+                lbl = ','.join(f"{k}={v}" for k, v in labels)
+                rows.append((name, lbl, h.count, round(h.total / h.count * 1000, 3),
+                             h.quantile(0.5) * 1000, h.quantile(0.99) * 1000))
+            for (name, labels), v in sorted({**self._counters, **self._gauges}.items()):
+                lbl = ','.join(f"{k}={v}" for k, v in labels)
+                rows.append((name, lbl, v, '', '', ''))
+        return rows
+
+    def to_prometheus(self) -> str:
+        def fmt(labels: Tuple, extra: str = '') -> str:
+            parts = [f'{k}="{v}"' for k, v in labels] + ([extra] if extra else [])
+            return '{' + ','.join(parts) + '}' if parts else ''
+
+        lines: List[str] = []
+        with self._lock:
+            for kind, store in (('counter', self._counters), ('gauge', self._gauges)):
+                typed = set()
+                for (name, labels), v in sorted(store.items()):
+                    full = f"{self.prefix}_{name}"
+                    if full not in typed:
+                        lines.append(f"# TYPE {full} {kind}")
+                        typed.add(full)
+                    lines.append(f"{full}{fmt(labels)} {v}")
+            typed = set()
+            for (name, labels), h in sorted(self._hists.items()):
+                full = f"{self.prefix}_{name}"
+                if full not in typed:
+                    lines.append(f"# TYPE {full} histogram")
+                    typed.add(full)
+                cumulative = 0
+                for bound, c in zip(LATENCY_BUCKETS + (float('inf'),), h.counts):
+                    cumulative += c
+                    le = 'le="+Inf"' if bound == float('inf') else f'le="{bound}"'
+                    lines.append(f"{full}_bucket{fmt(labels, le)} {cumulative}")
+                lines.append(f"{full}_sum{fmt(labels)} {h.total}")
+                lines.append(f"{full}_count{fmt(labels)} {h.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            fh.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> None:
+        """Expose ``/metrics`` on a local port from a daemon thread."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.to_prometheus().encode()
+                self.send_response(200 if self.path in ('/', '/metrics') else 404)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        register_shutdown_hook(server.shutdown)
+        logger.info('Serving metrics', extra={'host': host, 'port': port})
+
+metrics = Metrics()
 
 # --- DB Config & Connection Pool ---
-_db_pool: Optional[pooling.MySQLConnectionPool] = None
+# Server error codes worth retrying: can't connect, gone away, lost
+# connection, lock wait timeout, deadlock.
+TRANSIENT_ERRNOS = {2003, 2006, 2013, 2055, 1205, 1213}
+DB_RETRIES = int(os.getenv('DB_RETRIES', '3'))
+RETRY_BASE_DELAY = float(os.getenv('DB_RETRY_BASE', '0.05'))
+RETRY_MAX_DELAY = float(os.getenv('DB_RETRY_MAX', '2.0'))
+
+def _is_transient(exc: BaseException) -> bool:
+    code = getattr(exc, 'errno', None)
+    if code is None and exc.args and isinstance(exc.args[0], int):
+        code = exc.args[0]  # pymysql/aiomysql put the code in args[0]
+    if code in TRANSIENT_ERRNOS:
+        return True
+    mc = sys.modules.get('mysql.connector')
+    return mc is not None and isinstance(exc, (mc.errors.InterfaceError, mc.errors.PoolError))
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff, so retrying clients spread out."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+def with_retries(fn: Callable[[], Any], op: str, attempts: Optional[int] = None) -> Any:
+    """Call ``fn`` again after transient DB errors. Only for idempotent work."""
+    attempts = DB_RETRIES if attempts is None else attempts
+    for attempt in range(attempts + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == attempts or not _is_transient(e):
+                raise
+            delay = _backoff(attempt)
+            metrics.inc('op_retries_total', op=op)
+            logger.warning('Retrying after transient DB error',
+                           extra={'op': op, 'attempt': attempt + 1, 'delay': round(delay, 3),
+                                  'error': str(e)})
+            time.sleep(delay)
+
+class ConnectionPool:
+    """Thread-safe mysql.connector pool that grows with demand and shrinks when idle.
+
+    Connections are opened lazily up to ``max_size``; idle ones beyond
+    ``min_size`` are closed after ``idle_timeout`` seconds. A connection
+    idle longer than ``ping_after`` is pinged before reuse, and one older
+    than ``recycle`` is replaced, so a server restart or wait_timeout
+    shows up as a reconnect rather than an error in the caller.
+    """
+
+    def __init__(self, connect: Callable[[], Any], name: str = 'primary',
+                 min_size: int = 1, max_size: int = 10, idle_timeout: float = 60.0,
+                 recycle: float = 1800.0, ping_after: float = 5.0, acquire_timeout: float = 10.0):
+        self._connect = connect
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.idle_timeout = idle_timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self.acquire_timeout = acquire_timeout
+        self._idle: List[Tuple[Any, float]] = []   # (conn, last used); newest last
+        self._born: Dict[int, float] = {}
+        self._size = 0
+        self._cond = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _open(self) -> Any:
+        conn = with_retries(self._connect, op=f'connect:{self.name}')
+        self._born[id(conn)] = time.monotonic()
+        metrics.add_gauge('pool_connections', 1, pool=self.name)
+        return conn
+
+    def _discard(self, conn: Any) -> None:
+        self._born.pop(id(conn), None)
+        metrics.add_gauge('pool_connections', -1, pool=self.name)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn: Any, last_used: float, now: float) -> bool:
+        if now - self._born.get(id(conn), now) > self.recycle:
+            return False
+        if now - last_used < self.ping_after:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _reap(self, now: float) -> List[Any]:
+        """Pop idle connections past ``idle_timeout`` while above ``min_size`` (lock held)."""
+        stale = []
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            stale.append(self._idle.pop(0)[0])
+            self._size -= 1
+        return stale
+
+    def acquire(self) -> Any:
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    stale = self._reap(now)
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        conn = None
+                        break
+                    if now >= deadline:
+                        from mysql.connector.errors import PoolError
+                        raise PoolError(f"No connection available in pool '{self.name}' "
+                                        f"(max {self.max_size})")
+                    self._cond.wait(deadline - now)
+            for s in stale:
+                self._discard(s)
+            if conn is None:
+                try:
+                    return self._open()
+                except BaseException:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            if self._healthy(conn, last_used, time.monotonic()):
+                return conn
+            metrics.inc('pool_recycled_total', pool=self.name)
+            self._discard(conn)
+            with self._cond:
+                self._size -= 1
+
+    def release(self, conn: Any, broken: bool = False) -> None:
+        if not broken:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                broken = True
+        if broken:
+            self._discard(conn)
+        with self._cond:
+            if broken:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            self._discard(conn)
+
+_db_pool: Optional[ConnectionPool] = None
+_replica_pool: Optional[ConnectionPool] = None
 _DB_CONFIG: Dict[str, Any] = {}
+_REPLICA_CONFIG: Dict[str, Any] = {}
+
+def _connector(config: Dict[str, Any]) -> Callable[[], Any]:
+    import mysql.connector
+    kwargs = dict(config)
+    kwargs['database'] = kwargs.pop('db')
+    return lambda: mysql.connector.connect(**kwargs)
 
 def init_db_pool(host: str, port: int, user: str,
                  password: str, database: str,
-                 pool_size: int = 5) -> None:
-    global _db_pool, _DB_CONFIG
+                 pool_size: int = 5, unix_socket: Optional[str] = None,
+                 min_size: int = 1, replica: Optional[Tuple[str, int]] = None) -> None:
+    """Create the primary pool (``min_size``..``pool_size``) and, given ``replica``, a read pool."""
+    import mysql.connector
+    global _db_pool, _replica_pool, _DB_CONFIG, _REPLICA_CONFIG
     _DB_CONFIG = dict(host=host, port=port, user=user,
                       password=password, db=database)
+    if unix_socket:
+        _DB_CONFIG['unix_socket'] = unix_socket
+    opts = dict(min_size=min_size, max_size=pool_size,
+                idle_timeout=float(os.getenv('DB_POOL_IDLE_TIMEOUT', '60')),
+                recycle=float(os.getenv('DB_POOL_RECYCLE', '1800')))
     try:
-        _db_pool = pooling.MySQLConnectionPool(
-            pool_name='game_pool', pool_size=pool_size,
-            host=host, port=port, user=user,
-            password=password, database=database
-        )
-        logger.info('DB pool initialized', extra={'host': host, 'db': database})
+        _db_pool = ConnectionPool(_connector(_DB_CONFIG), 'primary', **opts)
+        _db_pool.release(_db_pool.acquire())
+        register_shutdown_hook(_db_pool.close)
+        if replica:
+            _REPLICA_CONFIG = dict(_DB_CONFIG, host=replica[0], port=replica[1])
+            _REPLICA_CONFIG.pop('unix_socket', None)
+            _replica_pool = ConnectionPool(_connector(_REPLICA_CONFIG), 'replica', **opts)
+            register_shutdown_hook(_replica_pool.close)
+        logger.info('DB pool initialized', extra={'host': host, 'db': database,
+                                                  'replica': replica[0] if replica else None})
     except mysql.connector.Error as e:
         logger.error('Failed to initialize DB pool', extra={'error': str(e)})
         sys.exit(2)
 
 @contextmanager
-def get_connection():
-    if _db_pool is None:
+def get_connection(read: bool = False):
+    """Borrow a pooled connection; ``read=True`` goes to the replica when one is configured."""
+    pool = _replica_pool if read and _replica_pool is not None else _db_pool
+    if pool is None:
         raise RuntimeError('DB pool not initialized')
-    conn = _db_pool.get_connection()
+    with metrics.timer('pool_wait_seconds', pool=pool.name):
+        conn = pool.acquire()
+    metrics.add_gauge('pool_connections_in_use', 1, pool=pool.name)
+    broken = False
     try:
         yield conn
+    except Exception as e:
+        broken = _is_transient(e)
+        raise
     finally:
-        conn.close()
+        pool.release(conn, broken)
+        metrics.add_gauge('pool_connections_in_use', -1, pool=pool.name)
 
 # --- Utility: DB error decorator ---
-def db_op(func: Callable) -> Callable:
+def _is_db_error(exc: BaseException) -> bool:
+    # A driver can only have raised if it was imported already.
+    for mod, err in (('mysql.connector', 'Error'), ('pymysql', 'MySQLError'), ('sqlite3', 'Error')):
+        m = sys.modules.get(mod)
+        if m is not None and isinstance(exc, getattr(m, err)):
+            return True
+    return False
+
+def db_op(func: Optional[Callable] = None, *, idempotent: bool = False) -> Callable:
+    """Log DB errors and exit(2); ``idempotent`` ops first retry transient errors."""
+    if func is None:
+        return lambda f: db_op(f, idempotent=idempotent)
+    op = func.__qualname__
     @wraps(func)
     def wrapper(*args, **kwargs):
+        start = time.perf_counter()
         try:
+            if idempotent:
+                return with_retries(lambda: func(*args, **kwargs), op)
             return func(*args, **kwargs)
-        except mysql.connector.Error as e:
+        except Exception as e:
+            metrics.inc('op_errors_total', op=op)
+            if not _is_db_error(e):
+                raise
             logger.error('DB error in %s', func.__name__, extra={'error': str(e)})
             sys.exit(2)
+        finally:
+            metrics.observe('op_duration_seconds', time.perf_counter() - start, op=op)
+    return wrapper
+
+def timed(func: Callable) -> Callable:
+    """Record call latency for methods that are not wrapped by ``db_op``."""
+    op = func.__qualname__
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with metrics.timer('op_duration_seconds', op=op):
+            return func(*args, **kwargs)
     return wrapper
 
-# --- Helper: Rich table printing ---
-def rich_print_table(columns: List[str], rows: List[tuple], title: str = "") -> None:
+# --- Helper: table rendering (rich for small results, streaming writers above) ---
+OUTPUT_FORMATS = ('table', 'tsv', 'json')
+_output_format = os.getenv('GAME_OUTPUT', 'table')
+RICH_MAX_ROWS = int(os.getenv('GAME_RICH_MAX_ROWS', '500'))
+WIDTH_SAMPLE_ROWS = 200
+MAX_COL_WIDTH = 40
+
+def set_output_format(fmt: str) -> None:
+    global _output_format
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    _output_format = fmt
+
+def _render_rich(columns: Sequence[str], rows: Iterable[tuple], title: str,
+                 out: Optional[IO[str]] = None) -> None:
+    from rich.table import Table
     table = Table(title=title, show_header=True, header_style="bold magenta")
     for col in columns:
         table.add_column(col)
     for row in rows:
         table.add_row(*(str(cell) for cell in row))
-    console.print(table)
+    if out is None:
+        console.print(table)
+    else:
+        from rich.console import Console
+        Console(file=out, width=console.width).print(table)
+
+def _render_fixed(columns: Sequence[str], rows: Iterable[tuple], title: str,
+                  out: IO[str]) -> None:
+    """Fixed-width text; column widths come from the header and the first rows."""
+    it = iter(rows)
+    sample = list(islice(it, WIDTH_SAMPLE_ROWS))
+    widths = [len(str(c)) for c in columns]
+    for row in sample:
+        for k, cell in enumerate(row):
+            widths[k] = max(widths[k], len(str(cell)))
+    widths = [min(w, MAX_COL_WIDTH) for w in widths]
+
+    def fmt(row: Sequence[Any]) -> str:
+        cells = []
+        for cell, w in zip(row, widths):
+            text = str(cell)
+            cells.append(text[:w - 1] + '~' if len(text) > w else text.ljust(w))
+        return '  '.join(cells).rstrip() + '\n'
+
+    if title:
+        out.write(title + '\n')
+    out.write(fmt(columns))
+    out.write('  '.join('-' * w for w in widths) + '\n')
+    out.writelines(fmt(row) for row in sample)
+    out.writelines(fmt(row) for row in it)
+
+def _render_tsv(columns: Sequence[str], rows: Iterable[tuple], out: IO[str]) -> None:
+    clean = str.maketrans('\t\n', '  ')
+    out.write('\t'.join(columns) + '\n')
+    out.writelines('\t'.join(str(c).translate(clean) for c in row) + '\n' for row in rows)
+
+def _render_json(columns: Sequence[str], rows: Iterable[tuple], out: IO[str]) -> None:
+    out.writelines(json.dumps(dict(zip(columns, row)), default=str) + '\n' for row in rows)
+
+def rich_print_table(columns: Sequence[str], rows: Iterable[tuple], title: str = "",
+                     fmt: Optional[str] = None, out: Optional[IO[str]] = None) -> None:
+    """Render ``rows`` in the selected output format.
+
+    ``table`` uses rich up to RICH_MAX_ROWS rows and switches to the streaming
+    fixed-width writer beyond that; ``tsv`` and ``json`` (one object per line)
+    always stream. ``rows`` may be any iterable and is consumed once.
+    """
+    fmt = fmt or _output_format
+    if fmt == 'tsv':
+        _render_tsv(columns, rows, out or sys.stdout)
+    elif fmt == 'json':
+        _render_json(columns, rows, out or sys.stdout)
+    else:
+        it = iter(rows)
+        head = list(islice(it, RICH_MAX_ROWS + 1))
+        if len(head) <= RICH_MAX_ROWS:
+            _render_rich(columns, head, title, out)
+        else:
+            _render_fixed(columns, chain(head, it), title, out or sys.stdout)
+
+def benchmark_render(counts: Sequence[int] = (1_000, 10_000, 100_000),
+                     rich_max: int = 20_000) -> List[tuple]:
+    """Time each renderer on synthetic score rows written to os.devnull."""
+    renderers: Dict[str, Callable[..., None]] = {
+        'rich':  lambda c, r, out: _render_rich(c, r, 'bench', out),
+        'fixed': lambda c, r, out: _render_fixed(c, r, 'bench', out),
+        'tsv':   _render_tsv,
+        'json':  _render_json,
+    }
+    results = []
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        for n in counts:
+            rows = [(f"player{i:07d}", (i * 7919) % 100_000, chr(65 + i % 26)) for i in range(n)]
+            for name, render in renderers.items():
+                if name == 'rich' and n > rich_max:
+                    results.append((n, name, None))
+                    continue
+                start = time.perf_counter()
+                render(SCORE_COLUMNS, rows, devnull)
+                results.append((n, name, round((time.perf_counter() - start) * 1000, 2)))
+    return results
+
+# --- Statement registry: SQL built once, prepared once per pooled connection ---
+class StatementRegistry:
+    """Builds each (operation, table) statement once and hands out prepared cursors.
+
+    ``sql()`` returns the cached text, used as is by the aiomysql helpers
+    (no server-side prepare) and by batched ``executemany`` writes, which
+    the driver turns into one multi-row INSERT. ``cursor()`` returns a
+    mysql.connector ``prepared=True`` cursor that is kept on the pooled
+    connection, so the server parses each statement once per connection.
+    Counters: ``statements_total{cache=sql|prepared,result=hit|miss}``.
+    """
+    TEMPLATES: Dict[str, str] = {
+        'insert': "INSERT IGNORE INTO `{table}` (Name, Score, Code) VALUES (%s, %s, %s)",
+        'fetch': "SELECT Name, Score, Code FROM `{table}`",
+        'update': "UPDATE `{table}` SET Score = Score + %s WHERE Name = %s",
+        'upsert': ("INSERT INTO `{table}` (Name, Score, Code) VALUES (%s, %s, %s) "
+                   "ON DUPLICATE KEY UPDATE Score = Score + VALUES(Score)"),
+        'players': "SELECT DISTINCT Name FROM `{table}`",
+        'exists': "SELECT 1 FROM `{table}` WHERE Name = %s FOR UPDATE",
+        'status_insert': "INSERT INTO Services (Name, Status, Restart) VALUES (%s, %s, %s)",
+        'history_insert': "INSERT INTO ServiceStatusHistory (Name, Status, ChangedAt) VALUES (%s, %s, %s)",
+    }
+    # Per-connection cap; the server limits prepared statements (max_prepared_stmt_count).
+    MAX_PER_CONNECTION = 128
+
+    def __init__(self):
+        self._sql: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def warm(self, tables: Iterable[str]) -> None:
+        for table in tables:
+            for op, tmpl in self.TEMPLATES.items():
+                if '{table}' in tmpl:
+                    self._build(op, table)
+
+    def _build(self, op: str, table: str) -> str:
+        if not _table_pattern.match(table or '_'):
+            raise ValueError(f"Invalid table name: {table}")
+        with self._lock:
+            return self._sql.setdefault((op, table), self.TEMPLATES[op].format(table=table))
+
+    def sql(self, op: str, table: str = '') -> str:
+        q = self._sql.get((op, table))
+        if q is None:
+            metrics.inc('statements_total', cache='sql', result='miss')
+            return self._build(op, table)
+        metrics.inc('statements_total', cache='sql', result='hit')
+        return q
+
+    def cursor(self, conn: Any, op: str, table: str = '') -> Any:
+        q = self.sql(op, table)
+        cache = getattr(conn, '_game_prepared', None)
+        if cache is None:
+            cache = OrderedDict()
+            conn._game_prepared = cache
+        cur = cache.get(q)
+        if cur is not None:
+            cache.move_to_end(q)
+            metrics.inc('statements_total', cache='prepared', result='hit')
+            return cur
+        metrics.inc('statements_total', cache='prepared', result='miss')
+        cur = cache[q] = conn.cursor(prepared=True)
+        if len(cache) > self.MAX_PER_CONNECTION:
+            cache.popitem(last=False)[1].close()
+        return cur
+
+    def execute(self, conn: Any, op: str, table: str = '', params: tuple = ()) -> Any:
+        cur = self.cursor(conn, op, table)
+        cur.execute(self._sql[(op, table)], params)
+        return cur
+
+statements = StatementRegistry()
+statements.warm(TABLE_MAP.values())
+
+# --- Async engine: one event loop + one aiomysql pool per process ---
+class AsyncEngine:
+    """Runs a private event loop on a daemon thread and owns a single aiomysql pool.
+
+    Sync code submits coroutines with ``run()``; the pool is created on first use
+    from ``_DB_CONFIG`` and reused for every later call instead of reconnecting.
+    Reads may ask for the replica pool (``_REPLICA_CONFIG``) when one is set.
+    """
+
+    def __init__(self, minsize: int = 1, maxsize: int = 5):
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self._loop: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._pools: Dict[str, Any] = {}
+        self._pool_lock: Any = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        import asyncio
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run() -> None:
+                asyncio.set_event_loop(loop)
+                self._pool_lock = asyncio.Lock()
+                ready.set()
+                loop.run_forever()
 
-# --- Async helpers for concurrency ---
-async def _async_fetch_scores(table: str) -> List[tuple]:
-    pool = await aiomysql.create_pool(minsize=1, maxsize=5, **_DB_CONFIG)
+            self._thread = threading.Thread(target=_run, name='async-engine', daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+        logger.info('Async engine started')
+
+    async def pool(self, read: bool = False) -> Any:
+        """Return a shared aiomysql pool, creating it on the engine loop on first use."""
+        role = 'replica' if read and _REPLICA_CONFIG else 'primary'
+        if role not in self._pools:
+            import aiomysql
+            assert self._pool_lock is not None
+            async with self._pool_lock:
+                if role not in self._pools:
+                    config = _REPLICA_CONFIG if role == 'replica' else _DB_CONFIG
+                    if not config:
+                        raise RuntimeError('DB pool not initialized')
+                    # autocommit: Pool.release closes a connection left inside a
+                    # transaction, so a plain SELECT would otherwise cost a reconnect.
+                    self._pools[role] = await aiomysql.create_pool(
+                        minsize=self.minsize, maxsize=self.maxsize, autocommit=True,
+                        pool_recycle=int(float(os.getenv('DB_POOL_RECYCLE', '1800'))), **config
+                    )
+        return self._pools[role]
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """Run ``coro`` on the engine loop and block until it finishes."""
+        import asyncio
+        if self._loop is None:
+            self.start()
+        assert self._loop is not None
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _close_pool(self) -> None:
+        for pool in self._pools.values():
+            pool.close()
+            await pool.wait_closed()
+        self._pools.clear()
+
+    def close(self) -> None:
+        import asyncio
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._close_pool(), loop).result(timeout=10)
+            except Exception as e:
+                logger.error('Failed to close async pool', extra={'error': str(e)})
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout=5)
+            loop.close()
+            self._loop = self._thread = None
+        logger.info('Async engine stopped')
+
+_engine = AsyncEngine(maxsize=FANOUT_LIMIT)
+
+# --- Async helpers for concurrency (run on the shared engine loop) ---
+async def _async_fetch_scores(table: str, read: bool = False) -> List[tuple]:
+    start = time.perf_counter()
+    pool = await _engine.pool(read)
     async with pool.acquire() as conn:
+        metrics.observe('async_pool_wait_seconds', time.perf_counter() - start)
         async with conn.cursor() as cur:
-            await cur.execute(f"SELECT Name, Score, Code FROM `{table}`")
+            await cur.execute(statements.sql('fetch', table))
             rows = await cur.fetchall()
-    pool.close()
-    await pool.wait_closed()
+    metrics.observe('op_duration_seconds', time.perf_counter() - start, op='_async_fetch_scores')
+    metrics.inc('rows_total', len(rows), op='read')
     return rows
 
+async def _async_fetch_many(tables: List[str], read: bool = False) -> List[List[tuple]]:
+    """Fetch many tables with at most ``FANOUT_LIMIT`` queries in flight."""
+    import asyncio
+    gate = asyncio.Semaphore(FANOUT_LIMIT)
+
+    async def one(tbl: str) -> List[tuple]:
+        async with gate:
+            return await _async_fetch_scores(tbl, read)
+    return list(await asyncio.gather(*(one(tbl) for tbl in tables)))
+
 async def _async_bulk_insert(table: str, data: List[tuple]) -> int:
-    pool = await aiomysql.create_pool(minsize=1, maxsize=5, **_DB_CONFIG)
+    start = time.perf_counter()
+    pool = await _engine.pool()
     async with pool.acquire() as conn:
-        async with conn.cursor() as cur:
-            await cur.executemany(
-                f"INSERT IGNORE INTO `{table}` (Name, Score, Code) VALUES (%s, %s, %s)",
-                data
-            )
+        metrics.observe('async_pool_wait_seconds', time.perf_counter() - start)
+        # One transaction per batch even though the pool runs in autocommit.
+        await conn.begin()
+        try:
+            async with conn.cursor() as cur:
+                await cur.executemany(statements.sql('insert', table), data)
+                written = cur.rowcount
             await conn.commit()
-    pool.close()
-    await pool.wait_closed()
-    return len(data)
+        except BaseException:
+            await conn.rollback()
+            raise
+    metrics.observe('op_duration_seconds', time.perf_counter() - start, op='_async_bulk_insert')
+    metrics.inc('rows_total', written, op='write')
+    return written
+
+# --- Sync wrappers around the engine ---
+def fetch_scores(table: str, read: bool = False) -> List[tuple]:
+    return with_retries(lambda: _engine.run(_async_fetch_scores(table, read)), 'fetch_scores')
+
+def fetch_scores_many(tables: List[str], read: bool = False) -> List[List[tuple]]:
+    return with_retries(lambda: _engine.run(_async_fetch_many(tables, read)), 'fetch_scores_many')
+
+def bulk_insert(table: str, data: List[tuple]) -> int:
+    return _engine.run(_async_bulk_insert(table, data))
+
+# --- Shutdown hooks (run newest-first, like atexit) ---
+_shutdown_hooks: List[Callable[[], None]] = []
+
+def register_shutdown_hook(hook: Callable[[], None]) -> None:
+    _shutdown_hooks.append(hook)
+
+def run_shutdown_hooks() -> None:
+    while _shutdown_hooks:
+        hook = _shutdown_hooks.pop()
+        try:
+            hook()
+        except Exception as e:
+            logger.error('Shutdown hook failed', extra={'hook': getattr(hook, '__name__', repr(hook)),
+                                                        'error': str(e)})
+
+register_shutdown_hook(_engine.close)
+
+# --- Write-behind queue with group commit ---
+class WriteBehindQueue:
+    """Buffers rows per key and flushes them in batches from a background thread.
+
+    A batch for a key is flushed when it reaches ``batch_size`` rows or when
+    ``flush_interval`` seconds have passed since the oldest buffered row.
+    ``flush_fn(key, rows)`` performs the write and returns the rows written;
+    rows it skipped (e.g. INSERT IGNORE duplicates) are counted as ignored.
+    Rows rejected because ``max_pending`` is reached are counted as dropped;
+    rows in a batch whose write raised are counted as failed. Stats
+    reconcile as enqueued = flushed + ignored + failed + dropped + pending.
+    """
+
+    def __init__(self, flush_fn: Callable[[Any, List[tuple]], int],
+                 batch_size: int = 500, flush_interval: float = 1.0,
+                 max_pending: int = 100_000, name: str = 'write-behind'):
+        self._flush_fn = flush_fn
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.name = name
+        self._buffers: Dict[Any, List[tuple]] = {}
+        self._pending = 0
+        self._oldest: Optional[float] = None
+        self._cond = threading.Condition()
+        # Reentrant so a flush() reached from inside another flush() on the
+        # same thread (e.g. via a signal handler) cannot deadlock.
+        self._flush_lock = threading.RLock()
+        self._closed = False
+        self.stats: Dict[str, int] = {'enqueued': 0, 'flushed': 0, 'ignored': 0, 'failed': 0,
+                                      'dropped': 0, 'batches': 0}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, key: Any, row: tuple) -> bool:
+        with self._cond:
+            if self._closed or self._pending >= self.max_pending:
+                self.stats['dropped'] += 1
+                return False
+            self._buffers.setdefault(key, []).append(row)
+            self._pending += 1
+            self.stats['enqueued'] += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if len(self._buffers[key]) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _take(self, force: bool) -> Dict[Any, List[tuple]]:
+        """Detach the buffers that are due (all of them when ``force``)."""
+        with self._cond:
+            expired = (self._oldest is not None
+                       and time.monotonic() - self._oldest >= self.flush_interval)
+            if force or expired:
+                taken, self._buffers = self._buffers, {}
+            else:
+                taken = {k: v for k, v in self._buffers.items() if len(v) >= self.batch_size}
+                for k in taken:
+                    del self._buffers[k]
+            self._pending -= sum(len(v) for v in taken.values())
+            if not self._buffers:
+                self._oldest = None
+            return taken
+
+    def _requeue(self, batches: Dict[Any, List[tuple]]) -> None:
+        with self._cond:
+            for key, rows in batches.items():
+                self._buffers.setdefault(key, [])[:0] = rows
+                self._pending += len(rows)
+            if self._buffers and self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def _write(self, batches: Dict[Any, List[tuple]]) -> None:
+        done: Dict[Any, int] = {}
+        try:
+            for key, rows in batches.items():
+                for i in range(0, len(rows), self.batch_size):
+                    chunk = rows[i:i + self.batch_size]
+                    try:
+                        written = self._flush_fn(key, chunk)
+                        self.stats['flushed'] += written
+                        self.stats['ignored'] += len(chunk) - written
+                        self.stats['batches'] += 1
+                    except Exception as e:
+                        self.stats['failed'] += len(chunk)
+                        logger.error('Batch flush failed', extra={'queue': self.name, 'key': str(key),
+                                                                  'rows': len(chunk), 'error': str(e)})
+                    done[key] = i + len(chunk)
+        except BaseException:
+            # Interrupted (SystemExit/KeyboardInterrupt): keep the unwritten rows
+            # buffered so the shutdown flush still writes them.
+            self._requeue({k: v[done.get(k, 0):] for k, v in batches.items() if v[done.get(k, 0):]})
+            raise
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                self._cond.wait(timeout=self.flush_interval)
+            with self._flush_lock:
+                self._write(self._take(force=False))
+
+    def flush(self) -> Dict[str, int]:
+        """Write every buffered row now and return the running counters."""
+        with self._flush_lock:
+            self._write(self._take(force=True))
+        return dict(self.stats)
+
+    def close(self) -> Dict[str, int]:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=self.flush_interval + 1)
+        stats = self.flush()
+        logger.info('Write-behind queue closed', extra={'queue': self.name, **stats})
+        return stats
+
+# --- Streaming import/export pipeline ---
+SCORE_COLUMNS: Tuple[str, ...] = ('Name', 'Score', 'Code')
+
+def _file_format(path: str) -> str:
+    base = path[:-3] if path.endswith('.gz') else path
+    ext = os.path.splitext(base)[1].lower()
+    if ext == '.csv':
+        return 'csv'
+    if ext in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f'Unsupported file type (use .csv or .jsonl, optionally .gz): {path}')
+
+def _open_text(path: str, mode: str) -> IO[str]:
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+def read_score_rows(path: str) -> Iterator[tuple]:
+    """Yield (Name, Score, Code) tuples from a CSV or JSONL file, one at a time."""
+    fmt = _file_format(path)
+    with _open_text(path, 'r') as fh:
+        records = csv.DictReader(fh) if fmt == 'csv' else (json.loads(line) for line in fh if line.strip())
+        for rec in records:
+            name = str(rec['Name']).strip()
+            code = rec.get('Code') or name[0].upper()
+            yield (name, int(rec['Score']), code)
+
+def write_rows(path: str, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+    """Stream ``rows`` to a CSV or JSONL file (gzip if the path ends in .gz)."""
+    fmt = _file_format(path)
+    count = 0
+    with _open_text(path, 'w') as fh:
+        if fmt == 'csv':
+            writer = csv.writer(fh, lineterminator='\n')
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                fh.write(json.dumps(dict(zip(columns, row)), default=str))
+                fh.write('\n')
+                count += 1
+    return count
+
+def chunked(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def stream_query(query: str, params: tuple = (), fetch_size: int = 5000) -> Iterator[tuple]:
+    """Yield rows of ``query`` through an unbuffered (server-side) cursor."""
+    with get_connection() as conn:
+        cur = conn.cursor(buffered=False)
+        try:
+            cur.execute(query, params)
+            while True:
+                rows = cur.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cur.close()
+
+# --- In-memory leaderboard ---
+class Leaderboard:
+    """Sorted array of (-score, name, code) rows mirroring one game table.
+
+    Rank and range lookups are binary searches; writes keep the array sorted
+    with ``insort`` so readers never touch the database after the first load.
+    """
+
+    def __init__(self, rows: Iterable[tuple] = ()):
+        self._lock = threading.RLock()
+        self._keys: List[Tuple[int, str, str]] = []
+        self._scores: Dict[str, List[int]] = {}
+        self.load(rows)
+
+    def load(self, rows: Iterable[tuple]) -> None:
+        with self._lock:
+            self._keys = sorted((-int(score), name, code) for name, score, code in rows)
+            self._scores = {}
+            for neg, name, _ in self._keys:
+                self._scores.setdefault(name, []).append(-neg)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def insert(self, name: str, score: int, code: str) -> None:
+        with self._lock:
+            insort(self._keys, (-score, name, code))
+            self._scores.setdefault(name, []).append(score)
+
+    def apply_delta(self, delta: int, name: str) -> None:
+        """Mirror ``UPDATE ... SET Score = Score + delta WHERE Name = name``."""
+        with self._lock:
+            scores = self._scores.get(name)
+            if not scores:
+                return
+            moved = []
+            for score in scores:
+                i = bisect_left(self._keys, (-score, name))
+                moved.append(self._keys.pop(i))
+            self._scores[name] = []
+            for neg, _, code in moved:
+                self.insert(name, -neg + delta, code)
+
+    def __contains__(self, name: str) -> bool:
+        return bool(self._scores.get(name))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.load([(n, 0, c) for _, n, c in self._keys])
+
+    def clear(self) -> None:
+        self.load(())
+
+    def top(self, n: int = 10) -> List[tuple]:
+        """Return (rank, name, score, code) for the first ``n`` rows."""
+        with self._lock:
+            return [(self._rank_of(-neg), name, -neg, code)
+                    for neg, name, code in self._keys[:n]]
+
+    def _rank_of(self, score: int) -> int:
+        # Competition ranking: 1 + number of rows with a strictly higher score.
+        return bisect_left(self._keys, -score, key=itemgetter(0)) + 1
+
+    def rank(self, name: str) -> Optional[int]:
+        with self._lock:
+            scores = self._scores.get(name)
+            return self._rank_of(max(scores)) if scores else None
+
+    def between(self, low: int, high: int) -> List[tuple]:
+        """Return (name, score, code) rows with ``low <= score <= high``, best first."""
+        with self._lock:
+            lo = bisect_left(self._keys, -high, key=itemgetter(0))
+            hi = bisect_right(self._keys, -low, key=itemgetter(0))
+            return [(name, -neg, code) for neg, name, code in self._keys[lo:hi]]
+
+    def diff(self, rows: Iterable[tuple]) -> Tuple[Counter, Counter]:
+        """Compare against table rows; returns (missing_here, extra_here)."""
+        table = Counter((name, int(score), code) for name, score, code in rows)
+        with self._lock:
+            mine = Counter((name, -neg, code) for neg, name, code in self._keys)
+        return table - mine, mine - table
+
+# --- Player name cache: TTL + LRU, with a bisect prefix index ---
+class PlayerIndex:
+    """Case-folded, sorted player names; prefix lookups are a binary search."""
+    __slots__ = ('names', '_folded', 'loaded_at')
+
+    def __init__(self, names: Iterable[str], loaded_at: Optional[float] = None):
+        pairs = sorted((n.casefold(), n) for n in set(names))
+        self._folded = [f for f, _ in pairs]
+        self.names = [n for _, n in pairs]
+        self.loaded_at = time.monotonic() if loaded_at is None else loaded_at
+
+    def complete(self, prefix: str, limit: int = 50) -> List[str]:
+        p = prefix.casefold()
+        i = bisect_left(self._folded, p)
+        out: List[str] = []
+        while i < len(self._folded) and len(out) < limit and self._folded[i].startswith(p):
+            out.append(self.names[i])
+            i += 1
+        return out
+
+    def add(self, name: str) -> None:
+        folded = name.casefold()
+        i = bisect_left(self._folded, folded)
+        while i < len(self._folded) and self._folded[i] == folded:
+            if self.names[i] == name:
+                return
+            i += 1
+        self._folded.insert(i, folded)
+        self.names.insert(i, name)
+
+class PlayerCache:
+    """Bounded per-game cache of PlayerIndex entries with TTL expiry and LRU eviction.
+
+    ``clock`` supplies the monotonic time used for expiry.
+    """
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 32,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: 'OrderedDict[Any, PlayerIndex]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, loader: Callable[[], Iterable[str]]) -> PlayerIndex:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry.loaded_at < self.ttl:
+                self._entries.move_to_end(key)
+                return entry
+        entry = PlayerIndex(loader(), loaded_at=self._clock())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def add(self, key: Any, name: str) -> None:
+        """Insert a new name into a cached index in place; no-op when ``key`` isn't cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.add(name)
+
+    def invalidate(self, key: Any = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+@lru_cache(maxsize=None)
+def _player_completer_class() -> type:
+    from prompt_toolkit.completion import Completer, Completion
+
+    class PlayerCompleter(Completer):
+        """prompt_toolkit completer backed by a callable returning prefix matches."""
+
+        def __init__(self, lookup: Callable[[str], List[str]]):
+            self._lookup = lookup
+
+        def get_completions(self, document, complete_event):
+            prefix = document.text_before_cursor.lstrip()
+            for name in self._lookup(prefix):
+                yield Completion(name, start_position=-len(prefix))
+
+    return PlayerCompleter
+
+def make_player_completer(lookup: Callable[[str], List[str]]) -> Any:
+    return _player_completer_class()(lookup)
+
+# --- Schema migration: keys for score tables, Services and Logs ---
+SCORE_TABLE_KEYS = {
+    'uq_name':   'UNIQUE KEY `uq_name` (Name)',
+    'idx_score': 'KEY `idx_score` (Score)',
+    'idx_code':  'KEY `idx_code` (Code)',
+}
+SERVICES_KEYS = {'uq_name': 'UNIQUE KEY `uq_name` (Name)'}
+LOGS_KEYS = {'idx_logdate': 'KEY `idx_logdate` (Logdate)'}
+
+def _percentile(sorted_vals: Sequence[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[idx]
+
+def _existing_indexes(cur: Any, table: str) -> set:
+    cur.execute(
+        "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,)
+    )
+    return {r[0] for r in cur.fetchall()}
+
+def _migrate_table(conn: Any, table: str, keys: Dict[str, str],
+                   dedupe_select: Optional[str] = None) -> List[str]:
+    """Add the missing ``keys`` to ``table`` and return the names added.
+
+    When a unique key cannot be added because of duplicate Names, the table is
+    rebuilt: rows are merged with ``dedupe_select`` into a copy that already has
+    the keys, the copy is swapped in with one RENAME, and the original is kept
+    as ``<table>__premigrate``.
+    """
+    with conn.cursor() as cur:
+        missing = {k: ddl for k, ddl in keys.items() if k not in _existing_indexes(cur, table)}
+        if not missing:
+            return []
+        dupes = 0
+        if dedupe_select and any(ddl.startswith('UNIQUE') for ddl in missing.values()):
+            cur.execute(f"SELECT COUNT(*) - COUNT(DISTINCT Name) FROM `{table}`")
+            dupes = cur.fetchone()[0]
+        adds = ', '.join(f"ADD {ddl}" for ddl in missing.values())
+        if not dupes:
+            cur.execute(f"ALTER TABLE `{table}` {adds}")
+        else:
+            new, old = f"{table}__new", f"{table}__premigrate"
+            cur.execute(f"DROP TABLE IF EXISTS `{new}`")
+            cur.execute(f"CREATE TABLE `{new}` LIKE `{table}`")
+            cur.execute(f"ALTER TABLE `{new}` {adds}")
+            cur.execute(f"INSERT INTO `{new}` {dedupe_select.format(table=table)}")
+            cur.execute(f"RENAME TABLE `{table}` TO `{old}`, `{new}` TO `{table}`")
+            logger.info('Merged duplicate rows', extra={'table': table, 'duplicates': dupes,
+                                                        'backup': old})
+        conn.commit()
+    logger.info('Added indexes', extra={'table': table, 'indexes': list(missing)})
+    return list(missing)
+
+def probe_latency(table: str, samples: int = 200) -> Dict[str, Tuple[float, float]]:
+    """Time read-only point lookups on ``table``; returns op -> (p50 ms, p99 ms)."""
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(f"SELECT Name, Code FROM `{table}` LIMIT %s", (samples,))
+        keys = cur.fetchall()
+        probes = {
+            'by_name': (f"SELECT Score FROM `{table}` WHERE Name = %s", 0),
+            'by_code': (f"SELECT COUNT(*) FROM `{table}` WHERE Code = %s", 1),
+            'top10':   (f"SELECT Name, Score FROM `{table}` ORDER BY Score DESC LIMIT 10", None),
+        }
+        result: Dict[str, Tuple[float, float]] = {}
+        for op, (q, col) in probes.items():
+            timings = []
+            for key in keys or [(None, None)]:
+                start = time.perf_counter()
+                cur.execute(q, () if col is None else (key[col],))
+                cur.fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            result[op] = (_percentile(timings, 0.50), _percentile(timings, 0.99))
+    return result
+
+@db_op
+def migrate_schema(probe: bool = True, samples: int = 200) -> Dict[str, Any]:
+    """Add the unique/secondary keys the Scoreboard queries rely on.
+
+    With ``probe`` the point-lookup latency of every game table is measured
+    before and after, so the effect of the new indexes is visible.
+    """
+    report: Dict[str, Any] = {}
+    before = {tbl: probe_latency(tbl, samples) for tbl in TABLE_MAP.values()} if probe else {}
+    with get_connection() as conn:
+        for tbl in TABLE_MAP.values():
+            report[tbl] = _migrate_table(
+                conn, tbl, SCORE_TABLE_KEYS,
+                "SELECT Name, SUM(Score), MIN(Code) FROM `{table}` GROUP BY Name"
+            )
+        report['Services'] = _migrate_table(
+            conn, 'Services', SERVICES_KEYS,
+            "SELECT Name, MAX(Status), MAX(Restart) FROM `{table}` GROUP BY Name"
+        )
+        report['Logs'] = _migrate_table(conn, 'Logs', LOGS_KEYS)
+    if probe:
+        after = {tbl: probe_latency(tbl, samples) for tbl in TABLE_MAP.values()}
+        report['latency'] = {tbl: {op: {'before': before[tbl][op], 'after': after[tbl][op]}
+                                   for op in after[tbl]} for tbl in after}
+    return report
+
+# --- Chunked, resumable archival into a day-partitioned Logs table ---
+ARCHIVE_CHECKPOINT_DDL = (
+    "CREATE TABLE IF NOT EXISTS `ArchiveCheckpoint` ("
+    " Game varchar(64) NOT NULL,"
+    " Logdate date NOT NULL,"
+    " LastName varchar(20) NOT NULL DEFAULT '',"
+    " Done tinyint NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (Game, Logdate))"
+)
+
+def _partition_name(day: date) -> str:
+    return f"p{day:%Y%m%d}"
+
+def _log_partitions(cur: Any, log_table: str) -> List[str]:
+    cur.execute(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION", (log_table,)
+    )
+    return [r[0] for r in cur.fetchall()]
+
+# Duplicate partition name / VALUES LESS THAN not increasing: another
+# process split p_future for this day first.
+PARTITION_EXISTS_ERRNOS = {1517, 1493}
+
+def ensure_log_partition(cur: Any, log_table: str, day: date) -> None:
+    """Split ``p_future`` so ``day`` gets its own partition (no-op if unpartitioned)."""
+    parts = _log_partitions(cur, log_table)
+    name = _partition_name(day)
+    if not parts or name in parts:
+        return
+    try:
+        cur.execute(
+            f"ALTER TABLE `{log_table}` REORGANIZE PARTITION p_future INTO ("
+            f"PARTITION {name} VALUES LESS THAN (TO_DAYS(%s)), "
+            f"PARTITION p_future VALUES LESS THAN MAXVALUE)", (day + timedelta(days=1),)
+        )
+    except Exception as e:
+        if getattr(e, 'errno', None) not in PARTITION_EXISTS_ERRNOS:
+            raise
+
+@db_op
+def drop_log_partitions_before(day: date, log_table: str = 'Logs') -> List[str]:
+    """Drop whole daily partitions older than ``day`` instead of DELETEing rows."""
+    with get_connection() as conn, conn.cursor() as cur:
+        old = [p for p in _log_partitions(cur, log_table)
+               if p != 'p_future' and p < _partition_name(day)]
+        if old:
+            cur.execute(f"ALTER TABLE `{log_table}` DROP PARTITION {', '.join(old)}")
+    logger.info('Dropped log partitions', extra={'table': log_table, 'partitions': old})
+    return old
+
+@db_op
+def migrate_logs_partitioned(log_table: str = 'Logs') -> bool:
+    """Rebuild ``log_table`` with a Game column, partitioned by day on Logdate.
+
+    Existing rows are copied with an empty Game; the original table is kept
+    as ``<log_table>__unpartitioned``. Returns False if already partitioned.
+    """
+    with get_connection() as conn, conn.cursor() as cur:
+        if _log_partitions(cur, log_table):
+            return False
+        cur.execute(f"SELECT DISTINCT DATE(Logdate) FROM `{log_table}` ORDER BY 1")
+        days = [r[0] for r in cur.fetchall()]
+        parts = [f"PARTITION {_partition_name(d)} VALUES LESS THAN "
+                 f"(TO_DAYS('{d + timedelta(days=1):%Y-%m-%d}'))" for d in days]
+        parts.append("PARTITION p_future VALUES LESS THAN MAXVALUE")
+        new, old = f"{log_table}__new", f"{log_table}__unpartitioned"
+        cur.execute(f"DROP TABLE IF EXISTS `{new}`")
+        cur.execute(
+            f"CREATE TABLE `{new}` ("
+            " Name varchar(20) NOT NULL,"
+            " Score int NOT NULL,"
+            " Logdate datetime NOT NULL,"
+            " Game varchar(64) NOT NULL DEFAULT '',"
+            " KEY `idx_logdate_game` (Logdate, Game, Name))"
+            f" PARTITION BY RANGE (TO_DAYS(Logdate)) ({', '.join(parts)})"
+        )
+        cur.execute(f"INSERT INTO `{new}` (Name, Score, Logdate) "
+                    f"SELECT Name, Score, Logdate FROM `{log_table}`")
+        cur.execute(f"RENAME TABLE `{log_table}` TO `{old}`, `{new}` TO `{log_table}`")
+        conn.commit()
+    logger.info('Partitioned log table', extra={'table': log_table, 'days': len(days), 'backup': old})
+    return True
+
+class ChunkedArchiver:
+    """Copies a game table into Logs and zeroes it in short, Name-ordered batches.
+
+    Every batch is one transaction covering a Name range (INSERT...SELECT,
+    UPDATE, checkpoint), so live writers only wait on the rows being moved.
+    Progress is kept in ``ArchiveCheckpoint``; an unfinished run is resumed
+    from its last committed Name on the next call.
+    """
+
+    def __init__(self, log_table: str = 'Logs', batch_size: int = 1000):
+        self.log_table = log_table
+        self.batch_size = batch_size
+        self._ready = False
+
+    def _prepare(self, cur: Any) -> None:
+        if not self._ready:
+            cur.execute(ARCHIVE_CHECKPOINT_DDL)
+            self._ready = True
+
+    def prepare_day(self, day: date) -> None:
+        """Create the checkpoint table and ``day``'s partition once, before any fan-out."""
+        with get_connection() as conn, conn.cursor() as cur:
+            self._prepare(cur)
+            ensure_log_partition(cur, self.log_table, day)
+
+    def archive(self, game_name: str, table: str, day: Optional[date] = None) -> int:
+        """Archive one game; call ``prepare_day`` first so ``day`` has a partition.
+
+        A game already archived for ``day`` is skipped, so a repeated call never
+        replaces its Logs rows with the zeroed scores. Only single batches are
+        retried; each retry re-reads the checkpoint before copying anything.
+        """
+        with get_connection() as conn, conn.cursor() as cur:
+            self._prepare(cur)
+            cur.execute("SELECT Logdate, LastName FROM ArchiveCheckpoint "
+                        "WHERE Game = %s AND Done = 0 ORDER BY Logdate LIMIT 1", (game_name,))
+            row = cur.fetchone()
+            if row:
+                day = row[0]
+                logger.info('Resuming archive', extra={'game': game_name, 'after': row[1]})
+            else:
+                day = day or date.today()
+                cur.execute("SELECT 1 FROM ArchiveCheckpoint WHERE Game = %s AND Logdate = %s",
+                            (game_name, day))
+                if cur.fetchall():
+                    logger.warning('Already archived', extra={'game': game_name, 'day': str(day)})
+                    return 0
+                cur.execute(f"DELETE FROM `{self.log_table}` WHERE Logdate = %s AND Game = %s",
+                            (day, game_name))
+                cur.execute("INSERT INTO ArchiveCheckpoint (Game, Logdate, LastName, Done) "
+                            "VALUES (%s, %s, '', 0)", (game_name, day))
+                conn.commit()
+        total = 0
+        while True:
+            moved = with_retries(lambda: self._archive_batch(game_name, table, day), 'archive_batch')
+            if moved is None:
+                break
+            total += moved
+        metrics.inc('rows_total', total, op='archive')
+        return total
+
+    def _archive_batch(self, game_name: str, table: str, day: date) -> Optional[int]:
+        """Move the next Name range in one transaction; None once the game is done."""
+        with get_connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT LastName, Done FROM ArchiveCheckpoint "
+                        "WHERE Game = %s AND Logdate = %s FOR UPDATE", (game_name, day))
+            last, done = cur.fetchone()
+            if done:
+                conn.commit()
+                return None
+            cur.execute(f"SELECT Name FROM `{table}` WHERE Name > %s ORDER BY Name LIMIT %s",
+                        (last, self.batch_size))
+            names = cur.fetchall()
+            if not names:
+                cur.execute("UPDATE ArchiveCheckpoint SET Done = 1 WHERE Game = %s AND Logdate = %s",
+                            (game_name, day))
+                conn.commit()
+                return None
+            hi = names[-1][0]
+            cur.execute(
+                f"INSERT INTO `{self.log_table}` (Name, Score, Logdate, Game) "
+                f"SELECT Name, Score, %s, %s FROM `{table}` WHERE Name > %s AND Name <= %s",
+                (day, game_name, last, hi)
+            )
+            moved = cur.rowcount
+            cur.execute(f"UPDATE `{table}` SET Score = 0 WHERE Name > %s AND Name <= %s",
+                        (last, hi))
+            cur.execute("UPDATE ArchiveCheckpoint SET LastName = %s "
+                        "WHERE Game = %s AND Logdate = %s", (hi, game_name, day))
+            conn.commit()
+            return moved
+
+# --- Storage backends ---
+SERVICE_HISTORY_DDL = (
+    "CREATE TABLE IF NOT EXISTS `ServiceStatusHistory` ("
+    " Name varchar(20) NOT NULL,"
+    " Status varchar(20) NOT NULL,"
+    " ChangedAt datetime(6) NOT NULL,"
+    " KEY `idx_name_time` (Name, ChangedAt),"
+    " KEY `idx_time` (ChangedAt))"
+)
+
+class StorageBackend(ABC):
+    """Storage calls made by Scoreboard and ServiceManager.
+
+    Tables are passed in by name (already validated against ``_table_pattern``);
+    score rows are ``(Name, Score, Code)`` tuples. Backends raise their driver's
+    errors and leave logging and exit policy to ``db_op``. Every abstract
+    method must be implemented before a backend can be created.
+    """
+    name = 'base'
+    _ident = '"{}"'
+    _param = '?'
+
+    @abstractmethod
+    def _query(self, q: str, params: Sequence[Any] = (), replica: bool = False) -> List[tuple]:
+        ...
+
+    def _union_sql(self, tables: Dict[str, str]) -> Tuple[str, List[str]]:
+        parts = [f"SELECT {self._param} AS Game, Name, Score FROM {self._ident.format(tbl)}"
+                 for tbl in tables.values()]
+        return ' UNION ALL '.join(parts), list(tables)
+
+    def aggregate_scores(self, tables: Dict[str, str], top: int = 10,
+                         per_game: bool = True) -> Tuple[List[tuple], List[tuple]]:
+        """Cross-game leaderboard computed by the database over a UNION ALL.
+
+        Returns (top players by total with, unless ``per_game`` is off, a
+        column per game, then games played and best single score; the best
+        player(s) of each game). Only those rows leave the server.
+        """
+        union, names = self._union_sql(tables)
+        cols = ''.join(f"SUM(CASE WHEN Game = {self._param} THEN Score ELSE 0 END), "
+                       for _ in names) if per_game else ''
+        totals = self._query(
+            f"SELECT Name, SUM(Score) AS Total, {cols}COUNT(*), MAX(Score) "
+            f"FROM ({union}) u GROUP BY Name ORDER BY Total DESC, Name LIMIT {int(top)}",
+            (names if per_game else []) + names, replica=True
+        )
+        bests = self._query(
+            f"SELECT u.Game, u.Name, u.Score FROM ({union}) u "
+            f"JOIN (SELECT Game, MAX(Score) AS Best FROM ({union}) v GROUP BY Game) m "
+            "ON u.Game = m.Game AND u.Score = m.Best ORDER BY u.Game, u.Name",
+            names + names, replica=True
+        )
+        return totals, bests
+
+    @abstractmethod
+    def ensure_schema(self, tables: Iterable[str]) -> None:
+        ...
+
+    @abstractmethod
+    def insert_score(self, table: str, row: tuple) -> int:
+        ...
+
+    @abstractmethod
+    def insert_scores(self, table: str, rows: List[tuple]) -> int:
+        """Insert rows, skipping names already present; returns the rows actually written."""
+
+    # ``replica=True`` marks reads that tolerate replication lag.
+    @abstractmethod
+    def fetch_scores(self, table: str, replica: bool = False) -> List[tuple]:
+        ...
+
+    def fetch_scores_many(self, tables: List[str], replica: bool = False) -> List[List[tuple]]:
+        return [self.fetch_scores(t, replica) for t in tables]
+
+    @abstractmethod
+    def iter_scores(self, table: str, fetch_size: int = 5000) -> Iterator[tuple]:
+        ...
+
+    @abstractmethod
+    def update_score(self, table: str, player: str, delta: int) -> int:
+        ...
+
+    @abstractmethod
+    def upsert_score(self, table: str, row: tuple) -> bool:
+        """Add or increment a player; True when a new row was inserted."""
+
+    @abstractmethod
+    def reset_scores(self, table: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear_table(self, table: str) -> None:
+        ...
+
+    @abstractmethod
+    def drop_table(self, table: str) -> None:
+        ...
+
+    @abstractmethod
+    def distinct_players(self, table: str, replica: bool = False) -> List[str]:
+        ...
+
+    @abstractmethod
+    def log_and_clear(self, tables: Dict[str, str], log_table: str,
+                      batch_size: int) -> Dict[str, Optional[int]]:
+        """Archive and zero each ``{game name: table}``; returns rows per game."""
+
+    @abstractmethod
+    def registry_rows(self) -> List[Tuple[str, str]]:
+        """(game name, table) pairs from ``GAME_REGISTRY_TABLE``, creating it if missing."""
+
+    @abstractmethod
+    def register_game(self, name: str, table: str) -> None:
+        """Create the score table and add or repoint its registry entry."""
+
+    @abstractmethod
+    def write_statuses(self, rows: List[tuple]) -> None:
+        ...
+
+    @abstractmethod
+    def append_history(self, rows: List[tuple]) -> None:
+        ...
+
+    @abstractmethod
+    def latest_statuses(self) -> List[tuple]:
+        ...
+
+    @abstractmethod
+    def status_points(self, since: datetime) -> Tuple[List[tuple], List[tuple]]:
+        """(status in force at ``since`` per unit, transitions after it ordered by unit/time)."""
+
+    def close(self) -> None:
+        pass
+
+class MySQLBackend(StorageBackend):
+    """The connection pool plus the shared aiomysql engine for reads and bulk writes."""
+    name = 'mysql'
+    _ident = '`{}`'
+    _param = '%s'
+
+    def __init__(self):
+        self._log_tables: Dict[str, bool] = {}
+
+    def _query(self, q: str, params: Sequence[Any] = (), replica: bool = False) -> List[tuple]:
+        with get_connection(read=replica) as conn, conn.cursor() as cur:
+            cur.execute(q, tuple(params))
+            return cur.fetchall()
+
+    def ensure_schema(self, tables: Iterable[str]) -> None:
+        with get_connection() as conn, conn.cursor() as cur:
+            for tbl in tables:
+                cur.execute(f"CREATE TABLE IF NOT EXISTS `{tbl}` (Name varchar(20) NOT NULL, "
+                            "Score int NOT NULL, Code varchar(3) NOT NULL, "
+                            "UNIQUE KEY `uq_name` (Name), KEY `idx_score` (Score), "
+                            "KEY `idx_code` (Code))")
+            conn.commit()
+
+    def insert_score(self, table: str, row: tuple) -> int:
+        with get_connection() as conn:
+            inserted = statements.execute(conn, 'insert', table, row).rowcount
+            conn.commit()
+        return inserted
+
+    def insert_scores(self, table: str, rows: List[tuple]) -> int:
+        return bulk_insert(table, rows)
+
+    def fetch_scores(self, table: str, replica: bool = False) -> List[tuple]:
+        return fetch_scores(table, read=replica)
+
+    def fetch_scores_many(self, tables: List[str], replica: bool = False) -> List[List[tuple]]:
+        return fetch_scores_many(tables, read=replica)
+
+    def iter_scores(self, table: str, fetch_size: int = 5000) -> Iterator[tuple]:
+        return stream_query(f"SELECT Name, Score, Code FROM `{table}`", fetch_size=fetch_size)
+
+    def update_score(self, table: str, player: str, delta: int) -> int:
+        with get_connection() as conn:
+            changed = statements.execute(conn, 'update', table, (delta, player)).rowcount
+            conn.commit()
+        return changed
+
+    def upsert_score(self, table: str, row: tuple) -> bool:
+        # The affected-row count cannot tell insert from update (0 for a zero
+        # delta, 1 for an update under CLIENT_FOUND_ROWS), so lock the row first.
+        with get_connection() as conn:
+            existed = statements.execute(conn, 'exists', table, (row[0],)).fetchall() != []
+            statements.execute(conn, 'upsert', table, row)
+            conn.commit()
+        return not existed
+
+    def _execute(self, q: str) -> None:
+        with get_connection() as conn, conn.cursor() as cur:
+            cur.execute(q)
+            conn.commit()
+
+    def reset_scores(self, table: str) -> None:
+        self._execute(f"UPDATE `{table}` SET Score = 0")
+
+    def clear_table(self, table: str) -> None:
+        self._execute(f"TRUNCATE TABLE `{table}`")
+
+    def drop_table(self, table: str) -> None:
+        self._execute(f"DROP TABLE IF EXISTS `{table}`")
+
+    def distinct_players(self, table: str, replica: bool = False) -> List[str]:
+        with get_connection(read=replica) as conn:
+            return [r[0] for r in statements.execute(conn, 'players', table).fetchall()]
+
+    def _logs_support_chunking(self, log_table: str) -> bool:
+        if log_table not in self._log_tables:
+            with get_connection() as conn, conn.cursor() as cur:
+                cur.execute(
+                    "SELECT COUNT(*) FROM information_schema.COLUMNS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'Game'",
+                    (log_table,)
+                )
+                self._log_tables[log_table] = cur.fetchone()[0] > 0
+        return self._log_tables[log_table]
+
+    def _log_and_clear_legacy(self, tbl: str, log_table: str) -> None:
+        with get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"DELETE FROM `{log_table}` WHERE Logdate = CURDATE()")
+            cur.execute(
+                f"INSERT INTO `{log_table}` (Name, Score, Logdate) "
+                f"SELECT Name, Score, CURDATE() FROM `{tbl}`"
+            )
+            cur.execute(f"UPDATE `{tbl}` SET Score = 0")
+            conn.commit()
+
+    def log_and_clear(self, tables: Dict[str, str], log_table: str,
+                      batch_size: int) -> Dict[str, Optional[int]]:
+        """Chunked, concurrent archival once Logs is partitioned; legacy copy otherwise."""
+        if self._logs_support_chunking(log_table):
+            archiver = ChunkedArchiver(log_table, batch_size)
+            day = date.today()
+            # One partition split up front: concurrent REORGANIZEs of p_future collide.
+            archiver.prepare_day(day)
+            with ThreadPoolExecutor(max_workers=min(len(tables), FANOUT_LIMIT)) as pool:
+                futures = {g: pool.submit(archiver.archive, g, tbl, day) for g, tbl in tables.items()}
+                return {g: fut.result() for g, fut in futures.items()}
+        if len(tables) > 1:
+            raise ValueError('Archiving ALL needs the partitioned Logs table (migrate first)')
+        for tbl in tables.values():
+            self._log_and_clear_legacy(tbl, log_table)
+        return {g: None for g in tables}
+
+    def _ensure_registry(self, cur: Any) -> None:
+        cur.execute(f"CREATE TABLE IF NOT EXISTS `{GAME_REGISTRY_TABLE}` ("
+                    "Name varchar(32) NOT NULL PRIMARY KEY, TableName varchar(64) NOT NULL)")
+
+    def registry_rows(self) -> List[Tuple[str, str]]:
+        with get_connection() as conn, conn.cursor() as cur:
+            self._ensure_registry(cur)
+            cur.execute(f"SELECT Name, TableName FROM `{GAME_REGISTRY_TABLE}` ORDER BY Name")
+            return cur.fetchall()
+
+    def register_game(self, name: str, table: str) -> None:
+        self.ensure_schema([table])
+        with get_connection() as conn, conn.cursor() as cur:
+            self._ensure_registry(cur)
+            cur.execute(f"INSERT INTO `{GAME_REGISTRY_TABLE}` (Name, TableName) VALUES (%s, %s) "
+                        "ON DUPLICATE KEY UPDATE TableName = VALUES(TableName)", (name, table))
+            conn.commit()
+
+    def write_statuses(self, rows: List[tuple]) -> None:
+        # Batched on purpose: on a cold start or after an outage every unit is a
+        # transition, so per-row statements would cost a round trip per unit.
+        latest = {r[0]: r for r in rows}
+        marks = ', '.join(['%s'] * len(latest))
+        with get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"DELETE FROM Services WHERE Name IN ({marks})", list(latest))
+            cur.executemany(statements.sql('status_insert'), list(latest.values()))
+            conn.commit()
+
+    def append_history(self, rows: List[tuple]) -> None:
+        with get_connection() as conn, conn.cursor() as cur:
+            cur.executemany(statements.sql('history_insert'), rows)
+            conn.commit()
+
+    def latest_statuses(self) -> List[tuple]:
+        with get_connection() as conn, conn.cursor() as cur:
+            cur.execute(SERVICE_HISTORY_DDL)
+            cur.execute(
+                "SELECT h.Name, h.Status FROM ServiceStatusHistory h "
+                "JOIN (SELECT Name, MAX(ChangedAt) AS At FROM ServiceStatusHistory GROUP BY Name) m "
+                "ON h.Name = m.Name AND h.ChangedAt = m.At"
+            )
+            return cur.fetchall()
+
+    def status_points(self, since: datetime) -> Tuple[List[tuple], List[tuple]]:
+        with get_connection() as conn, conn.cursor() as cur:
+            cur.execute(SERVICE_HISTORY_DDL)
+            cur.execute(
+                "SELECT h.Name, h.Status FROM ServiceStatusHistory h "
+                "JOIN (SELECT Name, MAX(ChangedAt) AS At FROM ServiceStatusHistory "
+                "      WHERE ChangedAt < %s GROUP BY Name) m "
+                "ON h.Name = m.Name AND h.ChangedAt = m.At", (since,)
+            )
+            before = cur.fetchall()
+            cur.execute("SELECT Name, Status, ChangedAt FROM ServiceStatusHistory "
+                        "WHERE ChangedAt >= %s ORDER BY Name, ChangedAt", (since,))
+            return before, cur.fetchall()
+
+class SQLiteBackend(StorageBackend):
+    """Embedded single-file storage for single-node deployments and tests.
+
+    Each thread gets its own connection in WAL mode, so readers never block
+    the writer. Every statement text is built once per table and reused, so
+    sqlite3's per-connection statement cache keeps it prepared. Multi-row
+    writes run in one explicit transaction.
+    """
+    name = 'sqlite'
+
+    def __init__(self, path: str = 'game.db'):
+        self.path = path
+        self._local = threading.local()
+        self._sql: Dict[Tuple[str, str], str] = {}
+        self._conns: List[Any] = []
+        self._conns_lock = threading.Lock()
+        self.ensure_schema(TABLE_MAP.values())
+
+    def _conn(self) -> Any:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            import sqlite3
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   cached_statements=256, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def _query(self, q: str, params: Sequence[Any] = (), replica: bool = False) -> List[tuple]:
+        return self._conn().execute(q, tuple(params)).fetchall()
+
+    @contextmanager
+    def _tx(self) -> Iterator[Any]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _q(self, op: str, table: str) -> str:
+        key = (op, table)
+        q = self._sql.get(key)
+        if q is None:
+            q = self._sql[key] = {
+                'insert': f'INSERT OR IGNORE INTO "{table}" (Name, Score, Code) VALUES (?, ?, ?)',
+                'fetch':  f'SELECT Name, Score, Code FROM "{table}"',
+                'update': f'UPDATE "{table}" SET Score = Score + ? WHERE Name = ?',
+                'exists': f'SELECT 1 FROM "{table}" WHERE Name = ?',
+                'upsert': (f'INSERT INTO "{table}" (Name, Score, Code) VALUES (?, ?, ?) '
+                           'ON CONFLICT(Name) DO UPDATE SET Score = Score + excluded.Score'),
+                'reset':  f'UPDATE "{table}" SET Score = 0',
+                'clear':  f'DELETE FROM "{table}"',
+                'names':  f'SELECT DISTINCT Name FROM "{table}"',
+            }[op]
+        return q
+
+    def ensure_schema(self, tables: Iterable[str]) -> None:
+        with self._tx() as conn:
+            for tbl in tables:
+                conn.execute(f'CREATE TABLE IF NOT EXISTS "{tbl}" (Name TEXT NOT NULL UNIQUE, '
+                             'Score INTEGER NOT NULL, Code TEXT NOT NULL)')
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "{tbl}_idx_score" ON "{tbl}" (Score)')
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "{tbl}_idx_code" ON "{tbl}" (Code)')
+            conn.execute('CREATE TABLE IF NOT EXISTS Logs (Name TEXT NOT NULL, Score INTEGER NOT NULL, '
+                         "Logdate TEXT NOT NULL, Game TEXT NOT NULL DEFAULT '')")
+            conn.execute('CREATE INDEX IF NOT EXISTS Logs_idx_day ON Logs (Logdate, Game)')
+            conn.execute('CREATE TABLE IF NOT EXISTS Services (Name TEXT PRIMARY KEY, '
+                         'Status TEXT NOT NULL, Restart TEXT NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS ServiceStatusHistory (Name TEXT NOT NULL, '
+                         'Status TEXT NOT NULL, ChangedAt TEXT NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS History_idx_name_time '
+                         'ON ServiceStatusHistory (Name, ChangedAt)')
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{GAME_REGISTRY_TABLE}" '
+                         '(Name TEXT PRIMARY KEY, TableName TEXT NOT NULL)')
+
+    def insert_score(self, table: str, row: tuple) -> int:
+        with self._tx() as conn:
+            return conn.execute(self._q('insert', table), row).rowcount
+
+    def insert_scores(self, table: str, rows: List[tuple]) -> int:
+        with self._tx() as conn:
+            return conn.executemany(self._q('insert', table), rows).rowcount
+
+    def fetch_scores(self, table: str, replica: bool = False) -> List[tuple]:
+        return self._conn().execute(self._q('fetch', table)).fetchall()
+
+    def iter_scores(self, table: str, fetch_size: int = 5000) -> Iterator[tuple]:
+        cur = self._conn().execute(self._q('fetch', table))
+        try:
+            while True:
+                rows = cur.fetchmany(fetch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cur.close()
+
+    def update_score(self, table: str, player: str, delta: int) -> int:
+        with self._tx() as conn:
+            return conn.execute(self._q('update', table), (delta, player)).rowcount
+
+    def upsert_score(self, table: str, row: tuple) -> bool:
+        with self._tx() as conn:
+            existed = conn.execute(self._q('exists', table), (row[0],)).fetchone() is not None
+            conn.execute(self._q('upsert', table), row)
+        return not existed
+
+    def reset_scores(self, table: str) -> None:
+        with self._tx() as conn:
+            conn.execute(self._q('reset', table))
+
+    def clear_table(self, table: str) -> None:
+        with self._tx() as conn:
+            conn.execute(self._q('clear', table))
+
+    def drop_table(self, table: str) -> None:
+        with self._tx() as conn:
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+
+    def distinct_players(self, table: str, replica: bool = False) -> List[str]:
+        return [r[0] for r in self._conn().execute(self._q('names', table))]
+
+    def log_and_clear(self, tables: Dict[str, str], log_table: str,
+                      batch_size: int) -> Dict[str, Optional[int]]:
+        day = date.today().isoformat()
+        done: Dict[str, Optional[int]] = {}
+        for game_name, tbl in tables.items():
+            with self._tx() as conn:
+                conn.execute(f'DELETE FROM "{log_table}" WHERE Logdate = ? AND Game = ?',
+                             (day, game_name))
+                done[game_name] = conn.execute(
+                    f'INSERT INTO "{log_table}" (Name, Score, Logdate, Game) '
+                    f'SELECT Name, Score, ?, ? FROM "{tbl}"', (day, game_name)
+                ).rowcount
+                conn.execute(self._q('reset', tbl))
+        return done
+
+    def registry_rows(self) -> List[Tuple[str, str]]:
+        return self._conn().execute(
+            f'SELECT Name, TableName FROM "{GAME_REGISTRY_TABLE}" ORDER BY Name').fetchall()
+
+    def register_game(self, name: str, table: str) -> None:
+        self.ensure_schema([table])
+        with self._tx() as conn:
+            conn.execute(f'INSERT INTO "{GAME_REGISTRY_TABLE}" (Name, TableName) VALUES (?, ?) '
+                         'ON CONFLICT(Name) DO UPDATE SET TableName = excluded.TableName', (name, table))
+
+    def write_statuses(self, rows: List[tuple]) -> None:
+        with self._tx() as conn:
+            conn.executemany('INSERT OR REPLACE INTO Services (Name, Status, Restart) VALUES (?, ?, ?)',
+                             rows)
+
+    def append_history(self, rows: List[tuple]) -> None:
+        with self._tx() as conn:
+            conn.executemany('INSERT INTO ServiceStatusHistory (Name, Status, ChangedAt) VALUES (?, ?, ?)',
+                             [(n, s, at.isoformat()) for n, s, at in rows])
+
+    def latest_statuses(self) -> List[tuple]:
+        # SQLite returns the bare column from the row holding MAX() in the group.
+        rows = self._conn().execute(
+            'SELECT Name, Status, MAX(ChangedAt) FROM ServiceStatusHistory GROUP BY Name'
+        ).fetchall()
+        return [(n, s) for n, s, _ in rows]
+
+    def status_points(self, since: datetime) -> Tuple[List[tuple], List[tuple]]:
+        conn = self._conn()
+        before = conn.execute(
+            'SELECT Name, Status, MAX(ChangedAt) FROM ServiceStatusHistory '
+            'WHERE ChangedAt < ? GROUP BY Name', (since.isoformat(),)
+        ).fetchall()
+        after = conn.execute(
+            'SELECT Name, Status, ChangedAt FROM ServiceStatusHistory '
+            'WHERE ChangedAt >= ? ORDER BY Name, ChangedAt', (since.isoformat(),)
+        ).fetchall()
+        return ([(n, s) for n, s, _ in before],
+                [(n, s, datetime.fromisoformat(at)) for n, s, at in after])
+
+    def close(self) -> None:
+        with self._conns_lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
+        self._local = threading.local()
+
+_backend: Optional[StorageBackend] = None
+
+def init_backend(kind: str = 'mysql', sqlite_path: str = 'game.db') -> StorageBackend:
+    """Select the process-wide backend (``DB_BACKEND`` / ``--backend``)."""
+    global _backend
+    if kind == 'sqlite':
+        _backend = SQLiteBackend(sqlite_path)
+        register_shutdown_hook(_backend.close)
+    elif kind == 'mysql':
+        _backend = MySQLBackend()
+    else:
+        raise ValueError(f"Unknown backend: {kind}")
+    logger.info('Storage backend selected', extra={'backend': kind})
+    return _backend
+
+def get_backend() -> StorageBackend:
+    global _backend
+    if _backend is None:
+        _backend = MySQLBackend()
+    return _backend
+
+# --- Game registry ---
+def game_key(name: str) -> GameKey:
+    """Map a game name to its enum member or a RegisteredGame."""
+    name = name.upper()
+    return Game[name] if name in Game.__members__ else RegisteredGame(name)
+
+def load_game_registry(backend: Optional[StorageBackend] = None) -> int:
+    """Merge the registry table into ``TABLE_MAP``; returns how many entries were accepted."""
+    accepted = 0
+    for name, table in (backend or get_backend()).registry_rows():
+        if name.upper() == 'ALL' or not _table_pattern.match(name) or not _table_pattern.match(table):
+            logger.error('Invalid game registry entry', extra={'game': name, 'table': table})
+            continue
+        TABLE_MAP[game_key(name)] = table
+        statements.warm([table])
+        accepted += 1
+    logger.info('Game registry loaded', extra={'games': len(TABLE_MAP), 'registered': accepted})
+    return accepted
+
+def register_game(name: str, table: str, backend: Optional[StorageBackend] = None) -> GameKey:
+    if name.upper() == 'ALL' or not _table_pattern.match(name) or not _table_pattern.match(table):
+        raise ValueError(f"Invalid game or table name: {name!r}, {table!r}")
+    (backend or get_backend()).register_game(name.upper(), table)
+    key = game_key(name)
+    TABLE_MAP[key] = table
+    statements.warm([table])
+    logger.info('Registered game', extra={'game': key.name, 'table': table})
+    return key
 
 # --- Scoreboard Class ---
+# Above this many games the combined leaderboard drops its per-game columns.
+COMBINED_GAME_COLUMNS = 10
+
 class Scoreboard:
-    def __init__(self):
-        self._player_cache: Dict[Game, List[str]] = {}
+    def __init__(self, buffered: bool = False, batch_size: int = 500,
+                 flush_interval: float = 1.0, player_ttl: float = 60.0,
+                 player_cache_size: int = 32, backend: Optional[StorageBackend] = None):
+        self._backend = backend or get_backend()
+        self._player_cache = PlayerCache(ttl=player_ttl, maxsize=player_cache_size)
+        self._boards: Dict[GameKey, Leaderboard] = {}
+        # Outcomes of background flushes, applied to the boards on the caller's thread.
+        self._flushed: SimpleQueue = SimpleQueue()
+        self._queue: Optional[WriteBehindQueue] = None
+        if buffered:
+            self._queue = WriteBehindQueue(self._write_batch, batch_size=batch_size,
+                                           flush_interval=flush_interval, name='score-ingest')
+            register_shutdown_hook(self._queue.close)
 
-    def _get_table(self, game: Game) -> str:
+    def _get_table(self, game: GameKey) -> str:
         return TABLE_MAP[game]
 
+    def _write_batch(self, tbl: str, rows: List[tuple]) -> int:
+        """Write-behind flush: insert the batch and report what happened to the boards."""
+        try:
+            written = self._backend.insert_scores(tbl, rows)
+        except Exception:
+            self._flushed.put((tbl, None))
+            raise
+        self._flushed.put((tbl, rows if written == len(rows) else None))
+        # Ignored rows were duplicates of names that already exist.
+        game = next((g for g, t in TABLE_MAP.items() if t == tbl), None)
+        for name, _, _ in rows:
+            self._player_cache.add(game, name)
+        return written
+
+    def _drain_queue(self) -> None:
+        """Write buffered adds before an operation that reads or rewrites their table."""
+        if self._queue is not None:
+            self._queue.flush()
+            self._apply_flushed()
+
+    def _apply_flushed(self) -> None:
+        """Add fully written batches to loaded boards; drop boards a batch only partly reached."""
+        games = None
+        while not self._flushed.empty():
+            tbl, rows = self._flushed.get()
+            if games is None:
+                games = {t: g for g, t in TABLE_MAP.items()}
+            board = self._boards.get(games.get(tbl))
+            if board is None:
+                continue
+            if rows is None:
+                self._boards.pop(games[tbl], None)
+            else:
+                for row in rows:
+                    board.insert(*row)
+
     @db_op
     def add_score(self, game: Game, player: str, score: int) -> None:
         tbl = self._get_table(game)
         code = player[0].upper()
-        q = f"INSERT IGNORE INTO `{tbl}` (Name, Score, Code) VALUES (%s, %s, %s)"
-        with get_connection() as conn, conn.cursor() as cur:
-            cur.execute(q, (player, score, code))
-            conn.commit()
+        board = self._boards.get(game)
+        if self._queue is not None:
+            # The board learns about the row once its batch is written (_apply_flushed).
+            if not self._queue.put(tbl, (player, score, code)):
+                logger.warning('Dropped score', extra={'game': game.name, 'player': player})
+            return
+        inserted = self._backend.insert_score(tbl, (player, score, code))
+        metrics.inc('rows_total', inserted, op='write')
+        if not inserted:
+            logger.warning('Duplicate ignored', extra={'game': game.name, 'player': player, 'score': score})
+            return
+        if board is not None:
+            board.insert(player, score, code)
+        self._player_cache.add(game, player)
         logger.info('Added score', extra={'game': game.name, 'player': player, 'score': score})
 
+    def flush(self) -> Dict[str, int]:
+        """Write any buffered scores; returns the queue counters (flushed, ignored, failed, ...)."""
+        if self._queue is None:
+            return {}
+        stats = self._queue.flush()
+        logger.info('Flushed scores', extra=stats)
+        return stats
+
+    @timed
     def show_scores(self, game: Game) -> None:
+        self._drain_queue()
         if game == Game.ALL:
             tables = list(TABLE_MAP.values())
-            results = asyncio.run(asyncio.gather(*( _async_fetch_scores(tbl) for tbl in tables )))
+            results = self._backend.fetch_scores_many(tables, replica=True)
             for tbl_name, rows in zip(tables, results):
                 if rows:
                     rich_print_table(['Name','Score','Code'], rows, title=tbl_name)
@@ -166,73 +2183,393 @@ class Scoreboard:
                     console.print(f"[yellow]No scores in {tbl_name}[/]")
         else:
             tbl = self._get_table(game)
-            rows = asyncio.run(_async_fetch_scores(tbl))
+            rows = self._backend.fetch_scores(tbl, replica=True)
             if rows:
                 rich_print_table(['Name','Score','Code'], rows, title=tbl)
             else:
                 console.print(f"[yellow]No scores in {tbl}[/]")
 
+    @db_op(idempotent=True)
+    def combined_leaderboard(self, top: int = 10) -> Tuple[List[tuple], List[tuple]]:
+        """Per-player totals across every game plus each game's best, aggregated server-side."""
+        self._drain_queue()
+        return self._backend.aggregate_scores({g.name: self._get_table(g) for g in TABLE_MAP}, top,
+                                              per_game=len(TABLE_MAP) <= COMBINED_GAME_COLUMNS)
+
+    @timed
+    def show_combined(self, top: int = 10) -> None:
+        totals, bests = self.combined_leaderboard(top)
+        if not totals:
+            console.print("[yellow]No scores in any game[/]")
+            return
+        games = [g.name for g in TABLE_MAP] if len(TABLE_MAP) <= COMBINED_GAME_COLUMNS else []
+        rich_print_table(['Name', 'Total', *games, 'Games', 'Best'], totals,
+                         title=f"All games Top {top}")
+        rich_print_table(['Game', 'Name', 'Score'], bests, title="Best per game")
+
     @db_op
     def update_score(self, game: Game, player: str, delta: int = 1) -> None:
+        self._drain_queue()
         tbl = self._get_table(game)
-        code = player[0].upper()
-        q = f"UPDATE `{tbl}` SET Score = Score + %s WHERE Code = %s"
-        with get_connection() as conn, conn.cursor() as cur:
-            cur.execute(q, (delta, code))
-            conn.commit()
+        metrics.inc('rows_total', self._backend.update_score(tbl, player, delta), op='write')
+        if game in self._boards:
+            self._boards[game].apply_delta(delta, player)
         logger.info('Updated score', extra={'game': game.name, 'player': player, 'delta': delta})
 
     @db_op
-    def reset_scores(self, game: Game) -> None:
+    def upsert_score(self, game: Game, player: str, score: int) -> None:
+        """Insert a player or add ``score`` to their total in one statement.
+
+        On MySQL this relies on the ``uq_name`` unique key added by ``migrate_schema``.
+        """
+        self._drain_queue()
         tbl = self._get_table(game)
-        with get_connection() as conn, conn.cursor() as cur:
-            cur.execute(f"UPDATE `{tbl}` SET Score = 0")
-            conn.commit()
+        code = player[0].upper()
+        inserted = self._backend.upsert_score(tbl, (player, score, code))
+        metrics.inc('rows_total', 1, op='write')
+        board = self._boards.get(game)
+        if board is not None:
+            if inserted or player not in board:
+                board.insert(player, score, code)
+            else:
+                board.apply_delta(score, player)
+        if inserted:
+            self._player_cache.add(game, player)
+        logger.info('Upserted score', extra={'game': game.name, 'player': player, 'score': score})
+
+    @db_op(idempotent=True)
+    def reset_scores(self, game: Game) -> None:
+        self._drain_queue()
+        self._backend.reset_scores(self._get_table(game))
+        if game in self._boards:
+            self._boards[game].reset()
         logger.info('Reset scores', extra={'game': game.name})
 
-    @db_op
+    @db_op(idempotent=True)
     def clear_table(self, game: Game) -> None:
-        tbl = self._get_table(game)
-        with get_connection() as conn, conn.cursor() as cur:
-            cur.execute(f"TRUNCATE TABLE `{tbl}`")
-            conn.commit()
+        self._drain_queue()
+        self._backend.clear_table(self._get_table(game))
+        if game in self._boards:
+            self._boards[game].clear()
+        self._player_cache.invalidate(game)
         logger.info('Cleared table', extra={'game': game.name})
 
+    # Not idempotent: a blind retry would archive already-zeroed scores.
+    # ChunkedArchiver retries single batches itself.
+    @db_op
+    def log_and_clear(self, game: Game, log_table: str = 'Logs',
+                      batch_size: int = 1000) -> None:
+        """Archive scores into ``log_table`` and zero them; ``Game.ALL`` runs every game.
+
+        On MySQL, once Logs has been rebuilt by ``migrate_logs_partitioned`` the
+        copy is done by ``ChunkedArchiver`` (all games concurrently); otherwise
+        the original single-transaction copy is used.
+        """
+        self._drain_queue()
+        games = list(TABLE_MAP) if game == Game.ALL else [game]
+        rows = self._backend.log_and_clear({g.name: self._get_table(g) for g in games},
+                                           log_table, batch_size)
+        for g in games:
+            if g in self._boards:
+                self._boards[g].reset()
+            self._player_cache.invalidate(g)
+            logger.info('Logged and cleared', extra={'game': g.name, 'rows': rows[g.name]})
+
     @db_op
-    def log_and_clear(self, game: Game, log_table: str = 'Logs') -> None:
+    def import_scores(self, game: Game, path: str, chunk_size: int = 5000,
+                      load_data: bool = False) -> int:
+        """Load a CSV/JSONL(.gz) file into a game table in constant memory.
+
+        Rows are inserted with chunked ``executemany`` and one commit per chunk.
+        With ``load_data`` an uncompressed CSV whose header is Name,Score,Code is
+        handed to the server via ``LOAD DATA LOCAL INFILE`` instead.
+        """
         tbl = self._get_table(game)
-        with get_connection() as conn, conn.cursor() as cur:
-            cur.execute(f"DELETE FROM `{log_table}` WHERE Logdate = CURDATE()")
-            cur.execute(
-                f"INSERT INTO `{log_table}` (Name, Score, Logdate) "
-                f"SELECT Name, Score, CURDATE() FROM `{tbl}`"
+        if load_data:
+            if self._backend.name != 'mysql':
+                raise ValueError('LOAD DATA is only available on the MySQL backend')
+            if _file_format(path) != 'csv' or path.endswith('.gz'):
+                raise ValueError('LOAD DATA needs an uncompressed .csv file')
+            import mysql.connector
+            conn = mysql.connector.connect(
+                host=_DB_CONFIG['host'], port=_DB_CONFIG['port'], user=_DB_CONFIG['user'],
+                password=_DB_CONFIG['password'], database=_DB_CONFIG['db'],
+                **({'unix_socket': _DB_CONFIG['unix_socket']} if 'unix_socket' in _DB_CONFIG else {}),
+                allow_local_infile=True,
             )
-            cur.execute(f"UPDATE `{tbl}` SET Score = 0")
-            conn.commit()
-        logger.info('Logged and cleared', extra={'game': game.name})
+            try:
+                cur = conn.cursor()
+                cur.execute(
+                    f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE `{tbl}` "
+                    "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                    "LINES TERMINATED BY '\\n' IGNORE 1 LINES (Name, Score, Code)",
+                    (os.path.abspath(path),)
+                )
+                total = cur.rowcount
+                conn.commit()
+                cur.close()
+            finally:
+                conn.close()
+        else:
+            total = 0
+            for chunk in chunked(read_score_rows(path), chunk_size):
+                total += self._backend.insert_scores(tbl, chunk)
+        self._boards.pop(game, None)
+        self._player_cache.invalidate(game)
+        metrics.inc('rows_total', total, op='import')
+        logger.info('Imported scores', extra={'game': game.name, 'path': path, 'rows': total})
+        return total
+
+    def _export_one(self, tbl: str, path: str, fetch_size: int) -> int:
+        return write_rows(path, SCORE_COLUMNS, self._backend.iter_scores(tbl, fetch_size))
+
+    @db_op(idempotent=True)
+    def export_scores(self, game: Game, out_dir: str, fmt: str = 'csv',
+                      compress: bool = False, fetch_size: int = 5000) -> Dict[str, int]:
+        """Stream one table, or every table for ``Game.ALL`` in parallel, to files."""
+        self._drain_queue()
+        games = [g for g in TABLE_MAP] if game == Game.ALL else [game]
+        os.makedirs(out_dir, exist_ok=True)
+        suffix = f".{fmt}" + ('.gz' if compress else '')
+        jobs = {self._get_table(g): os.path.join(out_dir, self._get_table(g) + suffix) for g in games}
+        results: Dict[str, int] = {}
+        with ThreadPoolExecutor(max_workers=min(len(jobs), FANOUT_LIMIT)) as pool:
+            futures = {tbl: pool.submit(self._export_one, tbl, path, fetch_size)
+                       for tbl, path in jobs.items()}
+            for tbl, fut in futures.items():
+                results[tbl] = fut.result()
+                metrics.inc('rows_total', results[tbl], op='export')
+                logger.info('Exported scores', extra={'table': tbl, 'path': jobs[tbl],
+                                                      'rows': results[tbl]})
+        return results
+
+    # Leaderboard queries: answered from memory once the table has been loaded.
+    def leaderboard(self, game: Game) -> Leaderboard:
+        self._apply_flushed()
+        board = self._boards.get(game)
+        if board is None:
+            board = self.reload_leaderboard(game)
+        return board
+
+    def reload_leaderboard(self, game: Game) -> Leaderboard:
+        self._drain_queue()
+        board = Leaderboard(self._backend.fetch_scores(self._get_table(game)))
+        self._boards[game] = board
+        logger.info('Loaded leaderboard', extra={'game': game.name, 'rows': len(board)})
+        return board
+
+    def verify_leaderboard(self, game: Game) -> bool:
+        """Check the in-memory leaderboard against the table, logging any drift."""
+        self._drain_queue()
+        missing, extra = self.leaderboard(game).diff(self._backend.fetch_scores(self._get_table(game)))
+        if missing or extra:
+            logger.warning('Leaderboard drift', extra={'game': game.name,
+                                                       'missing': sum(missing.values()),
+                                                       'extra': sum(extra.values())})
+            return False
+        return True
+
+    @timed
+    def top_scores(self, game: Game, n: int = 10) -> List[tuple]:
+        return self.leaderboard(game).top(n)
+
+    @timed
+    def player_rank(self, game: Game, player: str) -> Optional[int]:
+        return self.leaderboard(game).rank(player)
+
+    @timed
+    def scores_between(self, game: Game, low: int, high: int) -> List[tuple]:
+        return self.leaderboard(game).between(low, high)
 
+    def _load_players(self, game: Game) -> List[str]:
+        return self._backend.distinct_players(self._get_table(game), replica=True)
+
+    @timed
     def get_players(self, game: Game) -> List[str]:
-        if game not in self._player_cache:
-            tbl = self._get_table(game)
-            with get_connection() as conn, conn.cursor() as cur:
-                cur.execute(f"SELECT DISTINCT Name FROM `{tbl}`")
-                self._player_cache[game] = [r[0] for r in cur.fetchall()]
-        return self._player_cache[game]
+        return self._player_cache.get(game, lambda: self._load_players(game)).names
+
+    def complete_players(self, game: Game, prefix: str, limit: int = 50) -> List[str]:
+        return self._player_cache.get(game, lambda: self._load_players(game)).complete(prefix, limit)
+
+    def player_completer(self, game: Game) -> Any:
+        return make_player_completer(lambda prefix: self.complete_players(game, prefix))
 
 # --- ServiceManager Class ---
 class ServiceManager:
+    """Checks and controls units; records only status transitions.
+
+    The last written status of each unit is kept in memory (seeded once from
+    ``ServiceStatusHistory``). A check that sees the same status writes
+    nothing; a transition queues one history row plus a refresh of the
+    unit's Services row, and both are written in batches. A transition only
+    becomes the known status once its history row is written; if a batch
+    fails, its units are forgotten so the next check writes them again.
+    """
     NAME_P = re.compile(r'^[\w\-]+$')
 
+    def __init__(self, batch_size: int = 200, flush_interval: float = 2.0,
+                 backend: Optional[StorageBackend] = None):
+        self._backend = backend or get_backend()
+        self._last_state: Dict[str, str] = {}
+        self._queued_state: Dict[str, str] = {}
+        self._state_lock = threading.Lock()
+        self._seeded = False
+        self._writes = WriteBehindQueue(self._flush_writes, batch_size=batch_size,
+                                        flush_interval=flush_interval, name='service-status')
+        register_shutdown_hook(self._writes.close)
+
+    def _flush_writes(self, key: str, rows: List[tuple]) -> int:
+        try:
+            if key == 'history':
+                self._backend.append_history(rows)
+            else:
+                self._backend.write_statuses(rows)
+        except Exception:
+            with self._state_lock:
+                for name, *_ in rows:
+                    self._last_state.pop(name, None)
+                    self._queued_state.pop(name, None)
+            raise
+        if key == 'history':
+            with self._state_lock:
+                for name, status, _ in rows:
+                    self._last_state[name] = status
+                    if self._queued_state.get(name) == status:
+                        del self._queued_state[name]
+        return len(rows)
+
+    def _seed_states(self) -> None:
+        if self._seeded:
+            return
+        rows = self._backend.latest_statuses()
+        with self._state_lock:
+            for name, status in rows:
+                self._last_state.setdefault(name, status)
+            self._seeded = True
+
     @db_op
+    def _record_statuses(self, rows: List[tuple]) -> int:
+        """Queue writes for the units whose status changed; returns how many did."""
+        self._seed_states()
+        now = datetime.now()
+        changed = []
+        with self._state_lock:
+            for row in rows:
+                known = self._queued_state.get(row[0], self._last_state.get(row[0]))
+                if known != row[1]:
+                    self._queued_state[row[0]] = row[1]
+                    changed.append(row)
+        for name, status, restart in changed:
+            self._writes.put('Services', (name, status, restart))
+            self._writes.put('history', (name, status, now))
+        return len(changed)
+
     def _record_status(self, base: str, status: str, restart: str) -> None:
-        with get_connection() as conn, conn.cursor() as cur:
-            cur.execute("DELETE FROM Services WHERE Name = %s", (base.upper(),))
-            cur.execute(
-                "INSERT INTO Services (Name, Status, Restart) VALUES (%s, %s, %s)",
-                (base.upper(), status, restart)
-            )
-            conn.commit()
+        self._record_statuses([(base.upper(), status, restart)])
+
+    def flush(self) -> Dict[str, int]:
+        return self._writes.flush()
+
+    def _transitions(self, since: datetime) -> Dict[str, List[tuple]]:
+        """Per unit: the status in force at ``since`` followed by later transitions."""
+        self.flush()
+        out: Dict[str, List[tuple]] = {}
+        before, after = self._backend.status_points(since)
+        for name, status in before:
+            out[name] = [(status, since)]
+        for name, status, at in after:
+            out.setdefault(name, []).append((status, at))
+        return out
+
+    @db_op(idempotent=True)
+    def uptime_report(self, window: timedelta = timedelta(hours=24)) -> List[tuple]:
+        """Return (name, uptime %, flaps) per unit over the last ``window``.
+
+        Uptime covers the part of the window for which a status is known;
+        flaps count status changes inside the window, so a unit's first
+        recorded status is not one.
+        """
+        now = datetime.now()
+        since = now - window
+        report = []
+        for name, points in sorted(self._transitions(since).items()):
+            up = known = 0.0
+            for (status, start), nxt in zip(points, points[1:] + [(None, now)]):
+                span = (nxt[1] - start).total_seconds()
+                known += span
+                if status == 'Running':
+                    up += span
+            flaps = sum(1 for (prev, _), (status, _) in zip(points, points[1:]) if status != prev)
+            report.append((name, round(100.0 * up / known, 2) if known else 0.0, flaps))
+        return report
+
+    def uptime(self, raw_name: str, window: timedelta = timedelta(hours=24)) -> Optional[float]:
+        base = (raw_name[:-8] if raw_name.endswith('.service') else raw_name).upper()
+        for name, pct, _ in self.uptime_report(window):
+            if name == base:
+                return pct
+        return None
+
+    @staticmethod
+    def _systemctl_states(units: List[str], chunk: int = 200) -> List[bool]:
+        """ActiveState of many units from one ``systemctl show`` call per chunk."""
+        states: List[bool] = []
+        for i in range(0, len(units), chunk):
+            part = units[i:i + chunk]
+            out = subprocess.run(
+                ['systemctl', 'show', '--property=ActiveState', '--', *part],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            ).stdout
+            # One "ActiveState=..." block per unit, in argument order.
+            found = [line.split('=', 1)[1] == 'active'
+                     for line in out.splitlines() if line.startswith('ActiveState=')]
+            states.extend(found + [False] * (len(part) - len(found)))
+        return states
+
+    @staticmethod
+    async def _service_states(bases: List[str], concurrency: int) -> List[bool]:
+        import asyncio
+        sem = asyncio.Semaphore(concurrency)
 
+        async def probe(base: str) -> bool:
+            async with sem:
+                proc = await asyncio.create_subprocess_exec(
+                    'service', base, 'status',
+                    stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+                )
+                return await proc.wait() == 0
+
+        return list(await asyncio.gather(*(probe(b) for b in bases)))
+
+    @timed
+    def check_many(self, raw_names: List[str], concurrency: int = 32) -> List[tuple]:
+        """Check many units at once, queue their transitions and print a summary.
+
+        With systemd every state comes from batched ``systemctl show`` calls;
+        otherwise ``service <name> status`` runs as asyncio subprocesses,
+        at most ``concurrency`` at a time.
+        """
+        units, bases = [], []
+        for raw in raw_names:
+            base = raw[:-8] if raw.endswith('.service') else raw
+            if not self.NAME_P.match(base):
+                console.print(f"[red]Skipping invalid service name: {raw}[/]")
+                continue
+            units.append(raw)
+            bases.append(base)
+        if shutil.which('systemctl') is not None:
+            states = self._systemctl_states(units)
+        else:
+            states = _engine.run(self._service_states(bases, concurrency))
+        rows = [(b.upper(),) + (('Running', 'N') if up else ('Not Running', 'Y'))
+                for b, up in zip(bases, states)]
+        self._record_statuses(rows)
+        running = sum(states)
+        rich_print_table(['Service', 'Status', 'Restart'], rows,
+                         title=f"{running} running, {len(rows) - running} not running")
+        return rows
+
+    @timed
     def check_status(self, raw_name: str) -> None:
         base = raw_name[:-8] if raw_name.endswith('.service') else raw_name
         if not self.NAME_P.match(base):
@@ -247,6 +2584,7 @@ class ServiceManager:
         cmd_det = ['systemctl','status', raw_name, '--no-pager','--full'] if use_sc else ['service', base, 'status']
         subprocess.call(cmd_det)
 
+    @timed
     def control(self, raw_name: str, action: ServiceAction) -> None:
         base = raw_name[:-8] if raw_name.endswith('.service') else raw_name
         if not self.NAME_P.match(base):
@@ -256,7 +2594,7 @@ class ServiceManager:
         cmd = ['systemctl', action.value, raw_name] if use_sc else ['service', base, action.value]
         subprocess.call(cmd)
 
-# --- Fetch and cache services once ---
+# --- Fetch service names (cached on disk, refreshed in the background) ---
 def get_service_names() -> List[str]:
     try:
         out = subprocess.check_output(
@@ -267,12 +2605,173 @@ def get_service_names() -> List[str]:
     except Exception:
         return []
 
+class ServiceNameCache:
+    """Unit names for completion, served from a JSON file and refreshed off-thread.
+
+    ``start()`` returns immediately with whatever the cache file holds; when
+    it is older than ``ttl`` seconds (or missing) ``systemctl`` runs on a
+    daemon thread and the new list replaces ``names`` and the file. A refresh
+    that finds nothing (no systemctl, empty output) is retried after
+    ``retry_after`` seconds, doubling per failure up to ``ttl``.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 3600.0, retry_after: float = 30.0):
+        cache_home = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        self.path = path or os.path.join(cache_home, 'game', 'service_names.json')
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.names: List[str] = []
+        self.fetched_at = 0.0
+        self.attempted_at = 0.0
+        self.refresh_ms: Optional[float] = None
+        self._failures = 0
+        self._retry_at = 0.0
+        self._refreshing = threading.Lock()
+        self._completer: Any = None
+        self._completer_names: Optional[List[str]] = None
+
+    def load(self) -> bool:
+        try:
+            with open(self.path, encoding='utf-8') as fh:
+                data = json.load(fh)
+            self.names = list(data['names'])
+            self.fetched_at = float(data['fetched_at'])
+            self.refresh_ms = data.get('refresh_ms')
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump({'fetched_at': self.fetched_at, 'refresh_ms': self.refresh_ms,
+                       'names': self.names}, fh)
+        os.replace(tmp, self.path)
+
+    def stale(self) -> bool:
+        return time.time() - self.fetched_at > self.ttl
+
+    def due(self) -> bool:
+        """Stale, no refresh running, and outside the back-off after a failed one."""
+        return self.stale() and time.time() >= self._retry_at and not self._refreshing.locked()
+
+    def refresh(self) -> None:
+        if not self._refreshing.acquire(blocking=False):
+            return
+        try:
+            self.attempted_at = time.time()
+            self._retry_at = self.attempted_at + min(self.ttl, self.retry_after * 2 ** self._failures)
+            start = time.perf_counter()
+            names = get_service_names()
+            self.refresh_ms = round((time.perf_counter() - start) * 1000, 2)
+            if not names:
+                self._failures += 1
+                logger.warning('No service names found', extra={
+                    'retry_in': round(self._retry_at - self.attempted_at, 1)})
+                return
+            self._failures = 0
+            self.names = names
+            self.fetched_at = time.time()
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning('Could not write service cache', extra={'error': str(e)})
+        finally:
+            self._refreshing.release()
+
+    def refresh_async(self) -> None:
+        threading.Thread(target=self.refresh, name='service-names', daemon=True).start()
+
+    def start(self) -> List[str]:
+        start = time.perf_counter()
+        loaded = self.load()
+        load_ms = round((time.perf_counter() - start) * 1000, 2)
+        if not loaded or self.due():
+            self.refresh_async()
+        logger.info('Service names ready', extra={
+            'names': len(self.names), 'load_ms': load_ms, 'refresh_ms': self.refresh_ms,
+            'saved_ms': round(self.refresh_ms - load_ms, 2) if loaded and self.refresh_ms else None,
+        })
+        return self.names
+
+    def completer(self) -> Any:
+        """A completer that follows ``names`` as background refreshes land."""
+        from prompt_toolkit.completion import DynamicCompleter, WordCompleter
+
+        def current():
+            if self.due():
+                self.refresh_async()
+            if self._completer_names is not self.names:
+                self._completer_names = self.names
+                self._completer = WordCompleter(self.names, ignore_case=True)
+            return self._completer
+
+        return DynamicCompleter(current)
+
 # --- SQL Prompt Helper ---
-def sql_prompt_loop() -> None:
+SQL_HELP = [
+    ('\\timing', 'Toggle timing / row count after each statement'),
+    ('\\pagesize N', 'Rows per page'),
+    ('\\explain STMT', 'Run EXPLAIN for STMT'),
+    ('\\export FILE STMT', 'Stream the result of STMT to FILE (.csv/.jsonl[.gz])'),
+    ('\\help', 'Show this help'),
+    ('exit, quit, \\q', 'Leave the prompt'),
+]
+
+def _iter_cursor(cur: Any, size: int) -> Iterator[tuple]:
+    while True:
+        rows = cur.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+def _sql_run(conn: Any, stmt: str, page_size: int, more: Callable[[], bool],
+             export_path: Optional[str] = None) -> str:
+    """Execute ``stmt`` on an unbuffered cursor; page or export rows; return a summary."""
+    if export_path:
+        _file_format(export_path)   # reject a bad extension before running anything
+    cur = conn.cursor(buffered=False)
+    try:
+        cur.execute(stmt)
+        if not cur.with_rows:
+            return f"{cur.rowcount} rows affected"
+        cols = [d[0] for d in cur.description]
+        if export_path:
+            n = write_rows(export_path, cols, _iter_cursor(cur, page_size))
+            return f"{n} rows written to {export_path}"
+        total = 0
+        while True:
+            rows = cur.fetchmany(page_size)
+            if not rows:
+                break
+            rich_print_table(cols, rows, title=f"Rows {total + 1}-{total + len(rows)}")
+            total += len(rows)
+            if len(rows) < page_size:
+                break
+            if not more():
+                # Drain the rest without holding it, so the row count stays exact.
+                total += sum(1 for _ in _iter_cursor(cur, page_size))
+                break
+        return f"{total} rows"
+    finally:
+        # An export error or Ctrl-C at the pager leaves rows unread, which would
+        # break close() and every later statement on this session connection.
+        if conn.unread_result:
+            conn.consume_results()
+        cur.close()
+
+def sql_prompt_loop(page_size: int = 100) -> None:
+    from prompt_toolkit import PromptSession
     assert _db_pool is not None, "DB pool not initialized"
-    conn = _db_pool.get_connection()
-    cursor = conn.cursor()
+    conn = _db_pool.acquire()
     prompt = PromptSession('SQL> ')
+    pager = PromptSession()
+    timing = True
+
+    def more() -> bool:
+        return pager.prompt('-- more (Enter: next page, q: stop) -- ').strip().lower() != 'q'
+
     try:
         while True:
             try:
@@ -280,18 +2779,39 @@ def sql_prompt_loop() -> None:
             except (EOFError, KeyboardInterrupt):
                 print()
                 break
+            if not stmt:
+                continue
             if stmt.lower() in ('exit', 'quit', '\\q'):
                 break
+            export_path = None
+            if stmt.startswith('\\'):
+                meta, _, rest = stmt[1:].partition(' ')
+                meta, rest = meta.lower(), rest.strip()
+                if meta == 'timing':
+                    timing = not timing
+                    console.print(f"Timing {'on' if timing else 'off'}.")
+                    continue
+                if meta == 'pagesize' and rest.isdigit() and int(rest) > 0:
+                    page_size = int(rest)
+                    console.print(f"Page size {page_size}.")
+                    continue
+                if meta == 'explain' and rest:
+                    stmt = 'EXPLAIN ' + rest
+                elif meta == 'export' and ' ' in rest:
+                    export_path, _, stmt = rest.partition(' ')
+                else:
+                    rich_print_table(['Command', 'Description'], SQL_HELP, title="SQL prompt")
+                    continue
             if not stmt.endswith(';'):
                 stmt += ';'
             try:
-                cursor.execute(stmt)
-                if cursor.with_rows:
-                    rows = cursor.fetchall()
-                    cols = [d[0] for d in cursor.description]
-                    rich_print_table(cols, rows, title="Query Result")
-                else:
-                    console.print(f"[yellow]{cursor.rowcount} rows affected.[/]")
+                start = time.perf_counter()
+                summary = _sql_run(conn, stmt, page_size, more, export_path)
+                if timing:
+                    summary += f" in {time.perf_counter() - start:.3f}s"
+                console.print(f"[yellow]{summary}.[/]")
+            except KeyboardInterrupt:
+                console.print("[yellow]Cancelled.[/]")
             except Exception as e:
                 console.print(f"[red]SQL Error:[/] {e}")
     finally:
@@ -300,22 +2820,71 @@ def sql_prompt_loop() -> None:
             conn.commit()
         else:
             conn.rollback()
-        cursor.close()
-        conn.close()
+        _db_pool.release(conn)
 
 # --- Graceful Shutdown ---
 def shutdown_handler(signum: int, frame: Any) -> None:
+    # Only unwind here: the handler can interrupt a flush on this thread, so
+    # the hooks run from main()'s finally once the stack has been released.
     logger.info(f"Received signal {signum}, shutting down.")
     sys.exit(0)
 
 signal.signal(signal.SIGINT, shutdown_handler)
 signal.signal(signal.SIGTERM, shutdown_handler)
 
-# --- Main and Menu Setup ---
-def main() -> None:
+# --- DB connection from flags / environment ---
+MYSQL_ONLY_COMMANDS = ('sql', 'migrate', 'drop-logs')
+
+def connect_db(args: argparse.Namespace, session: Any = None) -> None:
+    """Initialise the backend; missing MySQL settings are prompted for only when ``session`` is given."""
+    if args.backend == 'sqlite':
+        init_backend('sqlite', args.sqlite_path)
+        load_game_registry()
+        return
+
+    def setting(value: Optional[str], label: str, default: str) -> str:
+        if value:
+            return value
+        if session is not None:
+            return session.prompt(f'{label} [{default}]: ') or default
+        return default
+
+    host = setting(args.host, 'DB Host', 'localhost')
+    port_str = setting(args.port, 'DB Port', '3306')
+    try:
+        port = int(port_str)
+    except ValueError:
+        console.print("[red]Invalid port.[/]")
+        sys.exit(1)
+    user = setting(args.user, 'DB User', 'kartik')
+    pwd  = os.getenv('DB_PASSWORD') or getpass.getpass('DB Password: ')
+    db   = setting(args.database, 'Database', 'KARTIK')
+    replica = None
+    if args.replica:
+        r_host, _, r_port = args.replica.partition(':')
+        replica = (r_host, int(r_port or port))
+    init_db_pool(host, port, user, pwd, db, unix_socket=args.socket,
+                 pool_size=int(os.getenv('DB_POOL_MAX', '10')),
+                 min_size=int(os.getenv('DB_POOL_MIN', '1')), replica=replica)
+    init_backend('mysql')
+    load_game_registry()
+
+def make_scoreboard(args: argparse.Namespace) -> 'Scoreboard':
+    return Scoreboard(
+        buffered=args.buffered or os.getenv('SCORE_BUFFERED', '').lower() in ('1', 'true', 'yes'),
+        batch_size=int(os.getenv('SCORE_BATCH_SIZE', '500')),
+        flush_interval=float(os.getenv('SCORE_FLUSH_INTERVAL', '1.0')),
+        player_ttl=float(os.getenv('PLAYER_CACHE_TTL', '60')),
+    )
+
+# --- Interactive Menu ---
+def run_menu(args: argparse.Namespace) -> None:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.completion import WordCompleter
+
     session = PromptSession()
-    games = [g.name for g in Game]
-    service_names = get_service_names()
+    services = ServiceNameCache(ttl=float(os.getenv('SERVICE_CACHE_TTL', '3600')))
+    services.start()
     MENU = [
         ('1','Add score'),
         ('2','Show scores'),
@@ -326,34 +2895,30 @@ def main() -> None:
         ('7','Service status'),
         ('8','Control service'),
         ('9','SQL prompt'),
+        ('10','Import scores'),
+        ('11','Export scores'),
+        ('12','Leaderboard'),
+        ('13','Migrate schema'),
+        ('14','Drop old logs'),
+        ('15','Service history'),
+        ('16','Stats'),
         ('0','Exit'),
     ]
-    games_completer   = WordCompleter(games, ignore_case=True)
-    service_completer = WordCompleter(service_names, ignore_case=True)
+    service_completer = services.completer()
     menu_completer    = WordCompleter([o for o,_ in MENU], ignore_case=True)
 
-    # DB config
-    host = os.getenv('DB_HOST') or session.prompt('DB Host [localhost]: ') or 'localhost'
-    port_str = os.getenv('DB_PORT') or session.prompt('DB Port [3306]: ') or '3306'
-    try:
-        port = int(port_str)
-    except ValueError:
-        console.print("[red]Invalid port.[/]")
-        sys.exit(1)
-    user = os.getenv('DB_USER') or session.prompt('DB User [kartik]: ') or 'kartik'
-    pwd  = os.getenv('DB_PASSWORD') or getpass.getpass('DB Password: ')
-    db   = os.getenv('DB_NAME') or session.prompt('Database [KARTIK]: ') or 'KARTIK'
-    init_db_pool(host, port, user, pwd, db)
-
-    sb = Scoreboard()
+    connect_db(args, session)
+    sb = make_scoreboard(args)
     sm = ServiceManager()
+    games = ['ALL'] + [g.name for g in TABLE_MAP]
+    games_completer = WordCompleter(games, ignore_case=True)
+    shown = ', '.join(games) if len(games) <= 8 else f"{', '.join(games[:7])}, ... ({len(games) - 1} games)"
 
     # Choose game
     while True:
-        g = session.prompt('Choose game (ALL, UNO, CHESS, CARROM): ',
-                           completer=games_completer).upper()
-        if g in Game.__members__:
-            game = Game[g]
+        key = game_key(session.prompt(f'Choose game ({shown}): ', completer=games_completer))
+        if key == Game.ALL or key in TABLE_MAP:
+            game = key
             break
         console.print("[red]Invalid game.[/]")
 
@@ -372,9 +2937,7 @@ def main() -> None:
         if game == Game.ALL:
             console.print("[red]Cannot update score in ALL.[/]")
             return
-        players = sb.get_players(game)
-        name = session.prompt('Player: ',
-                              completer=WordCompleter(players, ignore_case=True))
+        name = session.prompt('Player: ', completer=sb.player_completer(game))
         sb.update_score(game, name.strip())
 
     def reset_action():
@@ -390,14 +2953,19 @@ def main() -> None:
         sb.clear_table(game)
 
     def log_clear_action():
-        if game == Game.ALL:
-            console.print("[red]Cannot log & clear ALL.[/]")
-            return
-        sb.log_and_clear(game)
+        try:
+            sb.log_and_clear(game)
+        except ValueError as e:
+            console.print(f"[red]{e}[/]")
 
     def status_action():
-        svc = session.prompt('Service: ', completer=service_completer)
-        sm.check_status(svc.strip())
+        svc = session.prompt('Service(s), comma separated, or * for all: ',
+                             completer=service_completer).strip()
+        names = list(services.names) if svc == '*' else [n for n in re.split(r'[,\s]+', svc) if n]
+        if len(names) == 1:
+            sm.check_status(names[0])
+        elif names:
+            sm.check_many(names)
 
     def control_action():
         svc = session.prompt('Service: ', completer=service_completer)
@@ -407,8 +2975,78 @@ def main() -> None:
         )
         sm.control(svc.strip(), ServiceAction[act.upper()])
 
+    def import_action():
+        if game == Game.ALL:
+            console.print("[red]Cannot import into ALL.[/]")
+            return
+        path = session.prompt('File (.csv/.jsonl[.gz]): ').strip()
+        fast = session.prompt('Use LOAD DATA LOCAL INFILE? [y/N]: ').strip().lower() == 'y'
+        n = sb.import_scores(game, path, load_data=fast)
+        console.print(f"[green]Imported {n} rows.[/]")
+
+    def export_action():
+        out_dir = session.prompt('Output directory [export]: ').strip() or 'export'
+        fmt = session.prompt('Format (csv/jsonl) [csv]: ').strip().lower() or 'csv'
+        gz = session.prompt('Gzip? [y/N]: ').strip().lower() == 'y'
+        counts = sb.export_scores(game, out_dir, fmt=fmt, compress=gz)
+        rich_print_table(['Table', 'Rows'], list(counts.items()), title="Export")
+
+    def leaderboard_action():
+        if game == Game.ALL:
+            sb.show_combined(10)
+            return
+        rich_print_table(['Rank', 'Name', 'Score', 'Code'], sb.top_scores(game, 10),
+                         title=f"{game.name} Top 10")
+        name = session.prompt('Rank of player (blank to skip): ',
+                              completer=sb.player_completer(game)).strip()
+        if name:
+            rank = sb.player_rank(game, name)
+            console.print(f"{name}: rank {rank}" if rank else f"[yellow]{name} has no score[/]")
+        # Verifying re-reads the whole table, so it is opt-in.
+        if session.prompt('Verify against the table? [y/N]: ').strip().lower() == 'y':
+            if sb.verify_leaderboard(game):
+                console.print("[green]Leaderboard matches the table.[/]")
+            else:
+                console.print("[yellow]Leaderboard was out of sync; reloading.[/]")
+                sb.reload_leaderboard(game)
+
+    def migrate_action():
+        report = migrate_schema()
+        if session.prompt('Partition Logs by day? [y/N]: ').strip().lower() == 'y':
+            migrate_logs_partitioned()
+            sb._backend._log_tables.clear()
+        rows = []
+        for tbl, ops in report.pop('latency', {}).items():
+            for op, t in ops.items():
+                rows.append((tbl, op, f"{t['before'][0]:.2f}/{t['before'][1]:.2f}",
+                             f"{t['after'][0]:.2f}/{t['after'][1]:.2f}"))
+        for tbl, added in report.items():
+            console.print(f"{tbl}: {', '.join(added) if added else 'up to date'}")
+        if rows:
+            rich_print_table(['Table', 'Probe', 'Before p50/p99 ms', 'After p50/p99 ms'], rows,
+                             title="Lookup latency")
+
+    def drop_logs_action():
+        keep = int(session.prompt('Days of logs to keep [30]: ').strip() or '30')
+        dropped = drop_log_partitions_before(date.today() - timedelta(days=keep))
+        console.print(f"Dropped {len(dropped)} partition(s).")
+
+    def history_action():
+        hours = float(session.prompt('Window in hours [24]: ').strip() or '24')
+        rows = sm.uptime_report(timedelta(hours=hours))
+        rich_print_table(['Service', 'Uptime %', 'Flaps'], rows, title=f"Last {hours:g}h")
+
+    def stats_action():
+        rich_print_table(['Metric', 'Labels', 'Count', 'Mean ms', 'p50 ms', 'p99 ms'],
+                         metrics.summary(), title="Stats")
+        path = session.prompt('Write Prometheus text to file (blank to skip): ').strip()
+        if path:
+            metrics.write_prometheus(path)
+
     def sql_action(): sql_prompt_loop()
-    def exit_action(): sys.exit(0)
+    def exit_action():
+        run_shutdown_hooks()
+        sys.exit(0)
 
     dispatch: Dict[str, Callable[[], None]] = {
         '1': add_action,
@@ -420,6 +3058,13 @@ def main() -> None:
         '7': status_action,
         '8': control_action,
         '9': sql_action,
+        '10': import_action,
+        '11': export_action,
+        '12': leaderboard_action,
+        '13': migrate_action,
+        '14': drop_logs_action,
+        '15': history_action,
+        '16': stats_action,
         '0': exit_action,
     }
 
@@ -431,7 +3076,9 @@ def main() -> None:
         print_menu()
         choice = session.prompt('> ', completer=menu_completer).strip()
         action = dispatch.get(choice)
-        if action:
+        if action and args.backend == 'sqlite' and choice in ('9', '13', '14'):
+            console.print("[red]Only available on the MySQL backend.[/]")
+        elif action:
             try:
                 action()
             except Exception as e:
@@ -440,5 +3087,310 @@ def main() -> None:
         else:
             console.print("[red]Invalid choice[/]")
 
+# --- Non-interactive subcommands ---
+def _game_arg(value: str) -> GameKey:
+    # Registered games are only known after connecting; run_command checks them.
+    if not _table_pattern.match(value):
+        raise argparse.ArgumentTypeError(f"invalid game name: {value}")
+    return game_key(value)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Game scoreboard and service manager. Runs the interactive menu "
+                    "when no command is given."
+    )
+    parser.add_argument('--host', default=os.getenv('DB_HOST'), help="DB host (env DB_HOST).")
+    parser.add_argument('--port', default=os.getenv('DB_PORT'), help="DB port (env DB_PORT).")
+    parser.add_argument('--user', default=os.getenv('DB_USER'), help="DB user (env DB_USER).")
+    parser.add_argument('--database', default=os.getenv('DB_NAME'), help="Database (env DB_NAME).")
+    parser.add_argument('--socket', default=os.getenv('DB_SOCKET'),
+                        help="Connect over this Unix socket instead of TCP (env DB_SOCKET).")
+    parser.add_argument('--replica', default=os.getenv('DB_REPLICA'),
+                        help="HOST[:PORT] of a read replica for show/player lookups (env DB_REPLICA).")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'],
+                        default=os.getenv('DB_BACKEND', 'mysql'),
+                        help="Storage backend (env DB_BACKEND).")
+    parser.add_argument('--sqlite-path', default=os.getenv('SQLITE_PATH', 'game.db'),
+                        help="Database file for the sqlite backend (env SQLITE_PATH).")
+    parser.add_argument('--buffered', action='store_true',
+                        help="Buffer add_score writes and flush them in batches.")
+    parser.add_argument('--metrics-file', default=os.getenv('GAME_METRICS_FILE'),
+                        help="Write Prometheus text metrics to this file on exit.")
+    parser.add_argument('--metrics-port', type=int,
+                        default=int(os.getenv('GAME_METRICS_PORT', '0')) or None,
+                        help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics.")
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default=None,
+                        help="Result format: table (rich, or fixed-width for large results), "
+                             "tsv or json (env GAME_OUTPUT).")
+    sub = parser.add_subparsers(dest='command', metavar='command')
+
+    sub.add_parser('menu', help="Interactive menu (default).")
+    p = sub.add_parser('add', help="Add a score row.")
+    p.add_argument('game', type=_game_arg)
+    p.add_argument('player')
+    p.add_argument('score', type=int)
+    p = sub.add_parser('upsert', help="Insert a player or add to their score.")
+    p.add_argument('game', type=_game_arg)
+    p.add_argument('player')
+    p.add_argument('score', type=int)
+    p = sub.add_parser('show', help="Print scores for a game or ALL.")
+    p.add_argument('game', type=_game_arg)
+    p.add_argument('--combined', action='store_true',
+                   help="With ALL: one cross-game leaderboard aggregated by the database.")
+    p.add_argument('--top', type=int, default=10, help="Rows in the combined leaderboard.")
+    p = sub.add_parser('update', help="Add a delta to a player's score.")
+    p.add_argument('game', type=_game_arg)
+    p.add_argument('player')
+    p.add_argument('--delta', type=int, default=1)
+    for name, text in (('reset', "Zero every score of a game."),
+                       ('clear', "Truncate a game table.")):
+        sub.add_parser(name, help=text).add_argument('game', type=_game_arg)
+    p = sub.add_parser('log-clear', help="Archive scores into Logs and zero them.")
+    p.add_argument('game', type=_game_arg)
+    p.add_argument('--batch-size', type=int, default=1000)
+    p = sub.add_parser('leaderboard', help="Top-N and rank from the in-memory leaderboard "
+                                          "(ALL: combined, aggregated by the database).")
+    p.add_argument('game', type=_game_arg)
+    p.add_argument('--top', type=int, default=10)
+    p.add_argument('--player', help="Also print this player's rank.")
+    p.add_argument('--verify', action='store_true',
+                   help="Also compare the leaderboard with the table (full table read).")
+    p = sub.add_parser('import', help="Load a CSV/JSONL(.gz) file into a game table.")
+    p.add_argument('game', type=_game_arg)
+    p.add_argument('path')
+    p.add_argument('--load-data', action='store_true', help="Use LOAD DATA LOCAL INFILE.")
+    p.add_argument('--chunk-size', type=int, default=5000)
+    p = sub.add_parser('export', help="Stream game tables to CSV/JSONL files.")
+    p.add_argument('game', type=_game_arg)
+    p.add_argument('out_dir')
+    p.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    p.add_argument('--gzip', action='store_true')
+    p = sub.add_parser('migrate', help="Add keys/indexes to the score, Services and Logs tables.")
+    p.add_argument('--no-probe', action='store_true', help="Skip the latency probes.")
+    p.add_argument('--partition-logs', action='store_true', help="Rebuild Logs partitioned by day.")
+    p = sub.add_parser('drop-logs', help="Drop daily Logs partitions older than N days.")
+    p.add_argument('--keep', type=int, default=30)
+    sub.add_parser('games', help="List games and their tables.")
+    p = sub.add_parser('register-game', help="Add a game to the registry, creating its table.")
+    p.add_argument('name')
+    p.add_argument('table')
+    p = sub.add_parser('svc-status', help="Check one or more services.")
+    p.add_argument('names', nargs='+')
+    p = sub.add_parser('svc-control', help="Start/stop/restart a service.")
+    p.add_argument('name')
+    p.add_argument('action', type=str.upper, choices=[a.name for a in ServiceAction])
+    p = sub.add_parser('svc-history', help="Uptime and flap counts per service.")
+    p.add_argument('--hours', type=float, default=24)
+    sub.add_parser('sql', help="Interactive SQL prompt.")
+    p = sub.add_parser('startup-cost', help="Measure import time with python -X importtime.")
+    p.add_argument('--runs', type=int, default=5)
+    p.add_argument('--output', help="Append the measurement as a JSON line to this file.")
+    p.add_argument('cmd_args', nargs='*', default=['--help'],
+                   help="Arguments to time (default: --help).")
+    p = sub.add_parser('parity-check',
+                       help="Run the same operations on MySQL and a scratch SQLite file and compare.")
+    p.add_argument('--rows', type=int, default=1000)
+    p = sub.add_parser('render-bench', help="Time the table renderers against row count.")
+    p.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    p.add_argument('--rich-max', type=int, default=20_000,
+                   help="Skip the rich renderer above this many rows.")
+    return parser.parse_args(argv)
+
+def startup_cost(cmd_args: List[str], runs: int = 5, output: Optional[str] = None) -> Dict[str, Any]:
+    """Run this script under ``-X importtime`` and summarise where startup goes."""
+    totals: List[float] = []
+    modules: Dict[str, float] = {}
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', os.path.abspath(__file__), *cmd_args],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        totals.append((time.perf_counter() - start) * 1000)
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+            # Top-level imports are the ones without indentation.
+            if not line.split('|')[2].startswith('  '):
+                modules[name] = max(modules.get(name, 0.0), int(cumulative) / 1000)
+    totals.sort()
+    result = {
+        'args': cmd_args, 'runs': runs,
+        'wall_ms_p50': round(_percentile(totals, 0.5), 2),
+        'import_ms': round(sum(modules.values()), 2),
+        'top_modules': sorted(modules.items(), key=itemgetter(1), reverse=True)[:10],
+    }
+    if output:
+        with open(output, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps({'at': datetime.now().isoformat(timespec='seconds'), **result}) + '\n')
+    return result
+
+def parity_check(backends: Sequence[StorageBackend], rows: int = 1000,
+                 table: str = 'Parity_Scores') -> List[tuple]:
+    """Run one scripted sequence against each backend on a scratch table.
+
+    Returns (step, result per backend, match) rows; results are sorted so the
+    comparison does not depend on row order.
+    """
+    seed = [(f"p{i:05d}", i % 97, 'P') for i in range(rows)]
+    steps: List[Tuple[str, Callable[[StorageBackend], Any]]] = [
+        ('insert_scores', lambda b: b.insert_scores(table, seed)),
+        ('insert_score new', lambda b: b.insert_score(table, ('zed', 5, 'Z'))),
+        ('insert_score duplicate', lambda b: b.insert_score(table, ('zed', 9, 'Z'))),
+        ('update_score hit', lambda b: b.update_score(table, 'p00001', 10)),
+        ('update_score miss', lambda b: b.update_score(table, 'nobody', 10)),
+        ('upsert_score insert', lambda b: b.upsert_score(table, ('amy', 3, 'A'))),
+        ('upsert_score update', lambda b: b.upsert_score(table, ('amy', 4, 'A'))),
+        ('fetch_scores', lambda b: sorted(b.fetch_scores(table))),
+        ('iter_scores', lambda b: sorted(b.iter_scores(table, fetch_size=100))),
+        ('distinct_players', lambda b: sorted(b.distinct_players(table))),
+        ('reset_scores', lambda b: (b.reset_scores(table), sorted(b.fetch_scores(table)))[1]),
+        ('clear_table', lambda b: (b.clear_table(table), b.fetch_scores(table))[1]),
+    ]
+    for b in backends:
+        b.drop_table(table)
+        b.ensure_schema([table])
+    report = []
+    try:
+        for step, fn in steps:
+            results = [fn(b) for b in backends]
+            same = all(r == results[0] for r in results[1:])
+            shown = [f"{len(r)} rows" if isinstance(r, list) else r for r in results]
+            report.append((step, *shown, 'ok' if same else 'MISMATCH'))
+    finally:
+        for b in backends:
+            b.drop_table(table)
+    return report
+
+def run_command(args: argparse.Namespace) -> None:
+    cmd = args.command
+    if cmd == 'startup-cost':
+        res = startup_cost(args.cmd_args, args.runs, args.output)
+        console.print(f"wall p50 {res['wall_ms_p50']} ms, imports {res['import_ms']} ms")
+        rich_print_table(['Module', 'Cumulative ms'], res['top_modules'], title="Top imports")
+        return
+
+    if cmd == 'render-bench':
+        rows = [(n, name, '-' if ms is None else ms)
+                for n, name, ms in benchmark_render(args.rows, args.rich_max)]
+        rich_print_table(['Rows', 'Renderer', 'ms'], rows, title="Render time")
+        return
+
+    if args.backend == 'sqlite' and cmd in MYSQL_ONLY_COMMANDS:
+        console.print(f"[red]{cmd} is only available on the MySQL backend.[/]")
+        sys.exit(1)
+    if cmd == 'parity-check':
+        import tempfile
+        args.backend = 'mysql'
+        connect_db(args)
+        with tempfile.TemporaryDirectory() as tmp:
+            lite = SQLiteBackend(os.path.join(tmp, 'parity.db'))
+            try:
+                report = parity_check([get_backend(), lite], rows=args.rows)
+            finally:
+                lite.close()
+        rich_print_table(['Step', 'MySQL', 'SQLite', 'Match'], report, title="Backend parity")
+        if any(r[-1] != 'ok' for r in report):
+            sys.exit(1)
+        return
+
+    connect_db(args)
+    if cmd.startswith('svc-'):
+        sm = ServiceManager()
+        if cmd == 'svc-status':
+            if len(args.names) == 1:
+                sm.check_status(args.names[0])
+            else:
+                sm.check_many(args.names)
+        elif cmd == 'svc-control':
+            sm.control(args.name, ServiceAction[args.action])
+        else:
+            rich_print_table(['Service', 'Uptime %', 'Flaps'],
+                             sm.uptime_report(timedelta(hours=args.hours)),
+                             title=f"Last {args.hours:g}h")
+        return
+    if cmd == 'sql':
+        sql_prompt_loop()
+        return
+    if cmd == 'migrate':
+        report = migrate_schema(probe=not args.no_probe)
+        if args.partition_logs:
+            report['Logs partitioned'] = migrate_logs_partitioned()
+        print(json.dumps(report, default=str, indent=2))
+        return
+    if cmd == 'drop-logs':
+        dropped = drop_log_partitions_before(date.today() - timedelta(days=args.keep))
+        console.print(f"Dropped {len(dropped)} partition(s).")
+        return
+
+    if cmd == 'games':
+        rich_print_table(['Game', 'Table'], [(g.name, t) for g, t in TABLE_MAP.items()], title="Games")
+        return
+    if cmd == 'register-game':
+        register_game(args.name, args.table)
+        console.print(f"Registered {args.name.upper()} -> {args.table}")
+        return
+
+    sb = make_scoreboard(args)
+    game = args.game
+    if game != Game.ALL and game not in TABLE_MAP:
+        console.print(f"[red]Unknown game: {game.name}[/]")
+        sys.exit(1)
+    if game == Game.ALL and cmd not in ('show', 'export', 'log-clear', 'leaderboard'):
+        console.print(f"[red]{cmd} needs a single game, not ALL.[/]")
+        sys.exit(1)
+    if cmd == 'add':
+        sb.add_score(game, args.player, args.score)
+    elif cmd == 'upsert':
+        sb.upsert_score(game, args.player, args.score)
+    elif cmd == 'show' and args.combined and game == Game.ALL:
+        sb.show_combined(args.top)
+    elif cmd == 'show':
+        sb.show_scores(game)
+    elif cmd == 'update':
+        sb.update_score(game, args.player, args.delta)
+    elif cmd == 'reset':
+        sb.reset_scores(game)
+    elif cmd == 'clear':
+        sb.clear_table(game)
+    elif cmd == 'log-clear':
+        try:
+            sb.log_and_clear(game, batch_size=args.batch_size)
+        except ValueError as e:
+            console.print(f"[red]{e}[/]")
+            sys.exit(1)
+    elif cmd == 'leaderboard' and game == Game.ALL:
+        sb.show_combined(args.top)
+    elif cmd == 'leaderboard':
+        rich_print_table(['Rank', 'Name', 'Score', 'Code'], sb.top_scores(game, args.top),
+                         title=f"{game.name} Top {args.top}")
+        if args.player:
+            console.print(f"{args.player}: rank {sb.player_rank(game, args.player)}")
+        if args.verify and not sb.verify_leaderboard(game):
+            console.print("[yellow]Leaderboard does not match the table.[/]")
+            sys.exit(1)
+    elif cmd == 'import':
+        n = sb.import_scores(game, args.path, chunk_size=args.chunk_size, load_data=args.load_data)
+        console.print(f"Imported {n} rows.")
+    elif cmd == 'export':
+        counts = sb.export_scores(game, args.out_dir, fmt=args.format, compress=args.gzip)
+        rich_print_table(['Table', 'Rows'], list(counts.items()), title="Export")
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.output_format:
+        set_output_format(args.output_format)
+    setup_logging()
+    if args.metrics_file:
+        register_shutdown_hook(lambda: metrics.write_prometheus(args.metrics_file))
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    try:
+        if args.command in (None, 'menu'):
+            run_menu(args)
+        else:
+            run_command(args)
+    finally:
+        run_shutdown_hooks()
+
 if __name__ == '__main__':
     main()
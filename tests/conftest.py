@@ -0,0 +1,20 @@
+import os
+import signal
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game  # noqa: E402  (registers its signal handlers on import)
+
+# Keep Ctrl-C raising KeyboardInterrupt inside pytest.
+signal.signal(signal.SIGINT, signal.default_int_handler)
+signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    b = game.SQLiteBackend(str(tmp_path / 'game.db'))
+    yield b
+    b.close()
@@ -0,0 +1,19 @@
+import pytest
+
+import game
+
+
+def test_log_clear_reports_backend_refusal(tmp_path, monkeypatch):
+    def refuse(self, tables, log_table, batch_size):
+        raise ValueError('Archiving ALL needs the partitioned Logs table (migrate first)')
+
+    lines = []
+    monkeypatch.setattr(game, '_backend', None)
+    monkeypatch.setattr(game.SQLiteBackend, 'log_and_clear', refuse)
+    monkeypatch.setattr(game.console, 'print', lambda msg, *a, **k: lines.append(msg))
+    args = game.parse_args(['--backend', 'sqlite', '--sqlite-path', str(tmp_path / 'game.db'),
+                            'log-clear', 'ALL'])
+    with pytest.raises(SystemExit) as exc:
+        game.run_command(args)
+    assert exc.value.code == 1
+    assert 'partitioned Logs' in lines[-1]
@@ -0,0 +1,52 @@
+import struct
+import sys
+
+import pytest
+
+import Guess_Number as gn
+
+
+def test_simulate_reports_both_means():
+    pytest.importorskip('numpy')
+    (row,) = gn.simulate(2000, ['hard'], ['bisection'], seed=1, workers=1)
+    assert row['games'] == 2000
+    assert 0 < row['win_rate'] < 1
+    assert row['mean_attempts_won'] < row['mean_attempts_all'] <= 5
+
+
+def test_history_round_trip(tmp_path):
+    path = str(tmp_path / 'history.bin')
+    recorder = gn.HistoryRecorder(path)
+    game = gn.GuessNumberGame(1, 200, 5, seed=42, recorder=recorder)
+    game.round = 3
+    game.attempts = [100, 50, 25]
+    recorder.record(game, won=True)
+    game.attempts = [1, 2, 3, 4, 5]
+    recorder.record(game, won=False)
+    recorder.close()
+
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    assert gn.HISTORY_HEADER.unpack_from(data) == (gn.HISTORY_MAGIC, gn.HISTORY_VERSION,
+                                                   gn.HISTORY_GUESS_SLOTS)
+    body = data[gn.HISTORY_HEADER.size:]
+    first, second = struct.iter_unpack(gn.HISTORY_RECORD.format, body)
+    assert first[:8] == (42, 3, 1, 200, game.target_number, 5, 3, 1)
+    assert list(first[8:11]) == [100, 50, 25] and not any(first[11:])
+    assert second[6:8] == (5, 0)
+
+    (report,) = gn.history_report(path)
+    assert report == {'difficulty': 'hard', 'rounds': 2, 'win_rate': 0.5,
+                      'mean_attempts_won': 3.0, 'mean_attempts_all': 4.0}
+
+
+def test_history_report_without_numpy(tmp_path, monkeypatch):
+    path = str(tmp_path / 'history.bin')
+    recorder = gn.HistoryRecorder(path)
+    game = gn.GuessNumberGame(1, 50, 15, seed=1)
+    game.attempts = [25, 12]
+    recorder.record(game, won=True)
+    recorder.close()
+    expected = gn.history_report(path)
+    monkeypatch.setitem(sys.modules, 'numpy', None)
+    assert gn.history_report(path) == expected
@@ -0,0 +1,41 @@
+from game import Game, Leaderboard, Scoreboard
+
+
+# --- Leaderboard ---
+def test_leaderboard_competition_ranks():
+    board = Leaderboard([('ann', 30, 'A'), ('bob', 20, 'B'), ('cat', 30, 'C'), ('dan', 10, 'D')])
+    assert board.top(4) == [(1, 'ann', 30, 'A'), (1, 'cat', 30, 'C'),
+                            (3, 'bob', 20, 'B'), (4, 'dan', 10, 'D')]
+    assert board.rank('bob') == 3
+    assert board.rank('nobody') is None
+
+
+def test_leaderboard_insert_and_delta_keep_order():
+    board = Leaderboard([('ann', 30, 'A'), ('bob', 20, 'B')])
+    board.insert('cat', 25, 'C')
+    assert board.rank('cat') == 2
+    board.apply_delta(15, 'bob')
+    assert board.top(1) == [(1, 'bob', 35, 'B')]
+    assert board.rank('cat') == 3
+    assert 'cat' in board and 'eve' not in board
+
+
+def test_leaderboard_between_and_diff():
+    board = Leaderboard([('ann', 30, 'A'), ('bob', 20, 'B'), ('cat', 10, 'C')])
+    assert board.between(10, 20) == [('bob', 20, 'B'), ('cat', 10, 'C')]
+    missing, extra = board.diff([('ann', 30, 'A'), ('bob', 21, 'B'), ('cat', 10, 'C')])
+    assert missing == {('bob', 21, 'B'): 1}
+    assert extra == {('bob', 20, 'B'): 1}
+
+
+# --- Scoreboard boards in buffered mode ---
+def test_buffered_rows_reach_the_board_only_once_written(backend):
+    backend.insert_score('UNO', ('ann', 5, 'A'))
+    sb = Scoreboard(buffered=True, flush_interval=3600, backend=backend)
+    assert sb.top_scores(Game.UNO) == [(1, 'ann', 5, 'A')]
+    sb.add_score(Game.UNO, 'bob', 3)
+    sb.add_score(Game.UNO, 'ann', 9)    # duplicate: INSERT IGNORE drops it
+    assert sb.top_scores(Game.UNO) == [(1, 'ann', 5, 'A')]
+    sb.flush()
+    assert sb.top_scores(Game.UNO) == [(1, 'ann', 5, 'A'), (2, 'bob', 3, 'B')]
+    assert sb.verify_leaderboard(Game.UNO)
@@ -0,0 +1,58 @@
+from game import Game, PlayerCache, PlayerIndex, Scoreboard
+
+
+# --- Player cache ---
+def test_player_index_prefix_is_case_insensitive():
+    index = PlayerIndex(['alice', 'Albert', 'bob', 'ALINA', 'alice'])
+    assert index.complete('al') == ['Albert', 'alice', 'ALINA']
+    assert index.complete('AL', limit=2) == ['Albert', 'alice']
+    assert index.complete('z') == []
+
+
+def test_player_cache_ttl_and_lru():
+    clock = [100.0]
+    loads = []
+
+    def loader(names):
+        def load():
+            loads.append(names)
+            return names
+        return load
+
+    cache = PlayerCache(ttl=10, maxsize=2, clock=lambda: clock[0])
+    cache.get('a', loader(['x']))
+    cache.get('a', loader(['x']))
+    assert len(loads) == 1
+    clock[0] += 11
+    cache.get('a', loader(['y']))
+    assert len(loads) == 2
+
+    cache.get('b', loader(['b']))
+    cache.get('a', loader(['never']))   # refreshes 'a' as most recent
+    cache.get('c', loader(['c']))       # evicts 'b'
+    assert len(loads) == 4
+    assert cache.get('b', loader(['b2'])).names == ['b2']
+
+    cache.invalidate('c')
+    assert cache.get('c', loader(['c2'])).names == ['c2']
+
+
+def test_player_index_add_keeps_order():
+    index = PlayerIndex(['bob', 'Alice'])
+    index.add('alex')
+    index.add('bob')
+    assert index.names == ['alex', 'Alice', 'bob']
+    assert index.complete('al') == ['alex', 'Alice']
+
+
+def test_scoreboard_add_updates_cached_players(backend, monkeypatch):
+    sb = Scoreboard(backend=backend)
+    loads = []
+    monkeypatch.setattr(backend, 'distinct_players',
+                        lambda table, replica=False: loads.append(table) or ['ann'])
+    assert sb.get_players(Game.UNO) == ['ann']
+    sb.add_score(Game.UNO, 'bob', 3)
+    sb.add_score(Game.UNO, 'bob', 4)    # duplicate, ignored
+    assert sb.get_players(Game.UNO) == ['ann', 'bob']
+    assert loads == ['UNO']
+    assert sb.top_scores(Game.UNO) == [(1, 'bob', 3, 'B')]
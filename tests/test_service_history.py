@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from game import ServiceManager
+
+
+def test_sqlite_status_points(backend):
+    t0 = datetime(2026, 1, 1, 12)
+    backend.append_history([('WEB', 'Running', t0),
+                            ('WEB', 'Stopped', t0 + timedelta(hours=2)),
+                            ('DB', 'Running', t0 + timedelta(hours=3))])
+    before, after = backend.status_points(t0 + timedelta(hours=1))
+    assert before == [('WEB', 'Running')]
+    assert after == [('DB', 'Running', t0 + timedelta(hours=3)),
+                     ('WEB', 'Stopped', t0 + timedelta(hours=2))]
+    assert sorted(backend.latest_statuses()) == [('DB', 'Running'), ('WEB', 'Stopped')]
+
+
+def test_transition_is_known_only_after_its_write(backend, monkeypatch):
+    sm = ServiceManager(flush_interval=3600, backend=backend)
+    assert sm._record_statuses([('WEB', 'Running', 'no')]) == 1
+    assert sm._record_statuses([('WEB', 'Running', 'no')]) == 0   # already queued
+
+    def down(rows):
+        raise RuntimeError('database down')
+    monkeypatch.setattr(backend, 'append_history', down)
+    sm.flush()
+    monkeypatch.undo()
+
+    assert sm._record_statuses([('WEB', 'Running', 'no')]) == 1   # written again
+    sm.flush()
+    assert backend.latest_statuses() == [('WEB', 'Running')]
+    assert sm._record_statuses([('WEB', 'Running', 'no')]) == 0
+
+
+def test_first_status_is_not_a_flap(backend):
+    sm = ServiceManager(flush_interval=3600, backend=backend)
+    sm._record_statuses([('WEB', 'Running', 'no'), ('DB', 'Running', 'no')])
+    sm._record_statuses([('WEB', 'Stopped', 'no')])
+    report = {name: flaps for name, _, flaps in sm.uptime_report(timedelta(hours=1))}
+    assert report == {'DB': 0, 'WEB': 1}
@@ -0,0 +1,28 @@
+import json
+
+import game
+from game import ServiceNameCache
+
+
+def test_failed_refresh_backs_off(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(game, 'get_service_names', lambda: calls.append(1) or [])
+    cache = ServiceNameCache(str(tmp_path / 'names.json'), ttl=3600, retry_after=30)
+    assert cache.due()
+    cache.refresh()
+    assert len(calls) == 1
+    assert cache.stale() and not cache.due()
+    assert cache._retry_at - cache.attempted_at == 30
+    cache.refresh()
+    assert cache._retry_at - cache.attempted_at == 60
+
+
+def test_successful_refresh_is_saved(tmp_path, monkeypatch):
+    monkeypatch.setattr(game, 'get_service_names', lambda: ['a.service', 'b.service'])
+    path = tmp_path / 'names.json'
+    cache = ServiceNameCache(str(path))
+    cache.refresh()
+    assert not cache.due()
+    assert json.loads(path.read_text())['names'] == ['a.service', 'b.service']
+    fresh = ServiceNameCache(str(path))
+    assert fresh.load() and fresh.names == ['a.service', 'b.service'] and not fresh.stale()
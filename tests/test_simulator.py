@@ -0,0 +1,40 @@
+import pytest
+
+import Guess_Number as gn
+
+np = pytest.importorskip('numpy')
+
+
+def test_hint_rule_matches_for_ints_and_arrays():
+    guesses = np.arange(1, 21)
+    targets = np.full(20, 10)
+    vector = gn.hint_higher(guesses, targets)
+    assert vector.tolist() == [gn.hint_direction(int(g), 10) == 'higher' for g in guesses]
+
+
+def test_simulate_batch_histogram():
+    hist = gn.simulate_batch(('bisection', 1, 100, 10, 5000, 7))
+    assert len(hist) == 11
+    assert sum(hist) == 5000
+    # Bisection over 100 values needs at most 7 guesses.
+    assert hist[0] == 0 and not any(hist[8:])
+    assert hist == gn.simulate_batch(('bisection', 1, 100, 10, 5000, 7))
+
+
+def test_simulate_batch_agrees_with_game_hints():
+    # Replays one simulated bisection game with the scalar rule the game uses.
+    lower, upper, attempts = 1, 200, 5
+    rng = np.random.default_rng(3)
+    target = int(rng.integers(lower, upper + 1, size=1)[0])
+    lo, hi, solved = lower, upper, 0
+    for attempt in range(1, attempts + 1):
+        guess = (lo + hi) // 2
+        if guess == target:
+            solved = attempt
+            break
+        if gn.hint_direction(guess, target) == 'higher':
+            lo = guess + 1
+        else:
+            hi = guess - 1
+    hist = gn.simulate_batch(('bisection', lower, upper, attempts, 1, 3))
+    assert hist[solved] == 1
@@ -0,0 +1,55 @@
+import pytest
+
+import game
+
+
+class FakeResultConnection:
+    """Mimics an unbuffered mysql.connector connection: rows stay pending until read."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.unread_result = False
+        self.executed = []
+
+    def consume_results(self):
+        self.rows, self.unread_result = [], False
+
+    def cursor(self, buffered=True):
+        conn = self
+
+        class Cursor:
+            with_rows = True
+            description = [('Name',), ('Score',)]
+
+            def execute(self, stmt):
+                conn.executed.append(stmt)
+                conn.unread_result = bool(conn.rows)
+
+            def fetchmany(self, size):
+                out, conn.rows = conn.rows[:size], conn.rows[size:]
+                conn.unread_result = bool(conn.rows)
+                return out
+
+            def close(self):
+                if conn.unread_result:
+                    raise RuntimeError('Unread result found')
+        return Cursor()
+
+
+def test_sql_run_rejects_bad_export_before_executing():
+    conn = FakeResultConnection([('ann', 1)])
+    with pytest.raises(ValueError):
+        game._sql_run(conn, 'SELECT 1;', 10, lambda: True, export_path='out.txt')
+    assert conn.executed == []
+
+
+def test_sql_run_drains_rows_when_paging_is_interrupted(monkeypatch):
+    monkeypatch.setattr(game, 'rich_print_table', lambda *a, **k: None)
+    conn = FakeResultConnection([('p%d' % i, i) for i in range(5)])
+
+    def more():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        game._sql_run(conn, 'SELECT 1;', 2, more)
+    assert not conn.unread_result
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+import game
+from game import SQLiteBackend
+
+
+def test_sqlite_scores(backend):
+    assert backend.insert_score('UNO', ('ann', 5, 'A')) == 1
+    assert backend.insert_score('UNO', ('ann', 9, 'A')) == 0
+    assert backend.insert_scores('UNO', [('bob', 3, 'B'), ('ann', 1, 'A'), ('cat', 7, 'C')]) == 2
+    assert backend.update_score('UNO', 'bob', 4) == 1
+    assert backend.upsert_score('UNO', ('dan', 2, 'D')) is True
+    assert backend.upsert_score('UNO', ('dan', 0, 'D')) is False
+    assert sorted(backend.fetch_scores('UNO')) == [('ann', 5, 'A'), ('bob', 7, 'B'),
+                                                    ('cat', 7, 'C'), ('dan', 2, 'D')]
+    backend.reset_scores('UNO')
+    assert {s for _, s, _ in backend.fetch_scores('UNO')} == {0}
+    backend.clear_table('UNO')
+    assert backend.fetch_scores('UNO') == []
+
+
+def test_sqlite_scratch_tables(backend):
+    backend.ensure_schema(['Scratch'])
+    backend.insert_scores('Scratch', [('ann', 1, 'A'), ('bob', 2, 'B')])
+    assert sorted(backend.iter_scores('Scratch', fetch_size=1)) == [('ann', 1, 'A'), ('bob', 2, 'B')]
+    assert sorted(backend.distinct_players('Scratch')) == ['ann', 'bob']
+    backend.drop_table('Scratch')
+    backend.ensure_schema(['Scratch'])
+    assert backend.fetch_scores('Scratch') == []
+
+
+# --- Parity: every backend must answer the scripted sequence the same way ---
+def assert_parity(report):
+    mismatched = [row for row in report if row[-1] != 'ok']
+    assert not mismatched, mismatched
+
+
+def test_parity_sqlite(backend, tmp_path):
+    other = SQLiteBackend(str(tmp_path / 'other.db'))
+    try:
+        report = game.parity_check([backend, other], rows=200)
+    finally:
+        other.close()
+    assert_parity(report)
+    results = {step: first for step, first, *_ in report}
+    assert results['insert_scores'] == 200
+    assert results['insert_score duplicate'] == 0
+    assert results['update_score miss'] == 0
+    assert results['upsert_score insert'] is True
+    assert results['upsert_score update'] is False
+
+
+@pytest.fixture
+def mysql_backend():
+    env = {k: os.getenv(k) for k in ('DB_HOST', 'DB_USER', 'DB_PASSWORD', 'DB_NAME')}
+    if not all(env.values()):
+        pytest.skip('set DB_HOST, DB_USER, DB_PASSWORD and DB_NAME to run against MySQL')
+    game.init_db_pool(env['DB_HOST'], int(os.getenv('DB_PORT', '3306')), env['DB_USER'],
+                      env['DB_PASSWORD'], env['DB_NAME'], unix_socket=os.getenv('DB_SOCKET'))
+    yield game.MySQLBackend()
+    game.run_shutdown_hooks()
+
+
+def test_parity_mysql(mysql_backend, backend):
+    assert_parity(game.parity_check([mysql_backend, backend], rows=200))
+
+
+def test_incomplete_backend_fails_on_creation():
+    class Partial(game.StorageBackend):
+        def _query(self, q, params=(), replica=False):
+            return []
+
+    with pytest.raises(TypeError, match='abstract'):
+        Partial()
+    game.MySQLBackend()   # the shipped backends implement everything
@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+
+import pytest
+
+import game
+from game import MySQLBackend, StatementRegistry
+
+
+class FakeCursor:
+    def __init__(self):
+        self.executed = []
+        self.closed = False
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, params))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cursors = []
+
+    def cursor(self, prepared=False):
+        assert prepared
+        self.cursors.append(FakeCursor())
+        return self.cursors[-1]
+
+
+def test_statement_registry_reuses_prepared_cursors():
+    reg = StatementRegistry()
+    conn = FakeConnection()
+    cur = reg.execute(conn, 'insert', 'UNO', ('ann', 1, 'A'))
+    assert reg.execute(conn, 'insert', 'UNO', ('bob', 2, 'B')) is cur
+    assert cur.executed == [
+        ("INSERT IGNORE INTO `UNO` (Name, Score, Code) VALUES (%s, %s, %s)", ('ann', 1, 'A')),
+        ("INSERT IGNORE INTO `UNO` (Name, Score, Code) VALUES (%s, %s, %s)", ('bob', 2, 'B')),
+    ]
+    reg.execute(conn, 'fetch', 'UNO')
+    assert len(conn.cursors) == 2
+    assert reg.execute(FakeConnection(), 'insert', 'UNO', ()) is not cur
+
+
+def test_statement_registry_evicts_least_recent(monkeypatch):
+    reg = StatementRegistry()
+    monkeypatch.setattr(reg, 'MAX_PER_CONNECTION', 2)
+    conn = FakeConnection()
+    first = reg.cursor(conn, 'insert', 'T1')
+    reg.cursor(conn, 'insert', 'T2')
+    reg.cursor(conn, 'insert', 'T3')
+    assert first.closed
+    assert reg.cursor(conn, 'insert', 'T1') is not first
+    assert len(conn._game_prepared) == 2
+
+
+def test_statement_registry_rejects_bad_table():
+    with pytest.raises(ValueError):
+        StatementRegistry().sql('insert', 'UNO`; DROP TABLE x; --')
+
+
+# --- Batched status writes on MySQL ---
+class RecordingConnection:
+    def __init__(self):
+        self.calls = []
+        self.commits = 0
+
+    @contextmanager
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def execute(self, sql, params=()):
+                conn.calls.append(('execute', sql, list(params)))
+
+            def executemany(self, sql, rows):
+                conn.calls.append(('executemany', sql, list(rows)))
+        yield Cursor()
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    conn = RecordingConnection()
+
+    @contextmanager
+    def get_connection(read=False):
+        yield conn
+    monkeypatch.setattr(game, 'get_connection', get_connection)
+    return conn
+
+
+def test_write_statuses_is_one_delete_and_one_batch(recording):
+    MySQLBackend().write_statuses([('WEB', 'Stopped', 'no'), ('DB', 'Running', 'no'),
+                                   ('WEB', 'Running', 'yes')])
+    assert recording.calls == [
+        ('execute', "DELETE FROM Services WHERE Name IN (%s, %s)", ['WEB', 'DB']),
+        ('executemany', game.statements.sql('status_insert'),
+         [('WEB', 'Running', 'yes'), ('DB', 'Running', 'no')]),
+    ]
+    assert recording.commits == 1
+
+
+def test_append_history_is_one_batch(recording):
+    rows = [('WEB', 'Running', 1), ('DB', 'Stopped', 2)]
+    MySQLBackend().append_history(rows)
+    assert recording.calls == [('executemany', game.statements.sql('history_insert'), rows)]
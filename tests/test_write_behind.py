@@ -0,0 +1,87 @@
+import pytest
+
+import game
+from game import Game, Scoreboard, WriteBehindQueue
+
+
+# --- Write-behind queue ---
+def make_queue(flush_fn, **kw):
+    kw.setdefault('flush_interval', 3600)
+    return WriteBehindQueue(flush_fn, **kw)
+
+
+def test_write_behind_batches_and_counts():
+    calls = []
+
+    def flush_fn(key, rows):
+        calls.append((key, list(rows)))
+        return len(rows) - 1 if key == 'dups' else len(rows)
+
+    q = make_queue(flush_fn, batch_size=2)
+    for i in range(3):
+        q.put('t', (i,))
+    q.put('dups', ('x',))
+    q.put('dups', ('x',))
+    stats = q.close()
+    assert ('t', [(0,), (1,)]) in calls and ('t', [(2,)]) in calls
+    assert stats['enqueued'] == 5
+    assert stats['flushed'] == 4
+    assert stats['ignored'] == 1
+    assert stats['failed'] == 0
+
+
+def test_write_behind_failed_and_dropped():
+    def flush_fn(key, rows):
+        raise RuntimeError('down')
+
+    q = make_queue(flush_fn, batch_size=10, max_pending=2)
+    assert q.put('t', (1,)) and q.put('t', (2,))
+    assert not q.put('t', (3,))
+    stats = q.close()
+    assert stats['failed'] == 2
+    assert stats['dropped'] == 1
+    assert not q.put('t', (4,))
+
+
+def test_write_behind_interrupted_flush_keeps_rows():
+    written = []
+
+    def flush_fn(key, rows):
+        if not written:
+            written.append(None)
+            raise KeyboardInterrupt
+        written.extend(rows)
+        return len(rows)
+
+    q = make_queue(flush_fn, batch_size=2)
+    for i in range(3):
+        q.put('t', (i,))
+    with pytest.raises(KeyboardInterrupt):
+        q.flush()
+    stats = q.close()
+    assert written[1:] == [(0,), (1,), (2,)]
+    assert stats['flushed'] == 3
+
+
+def test_signal_handler_leaves_the_flush_to_main():
+    calls = []
+    game.register_shutdown_hook(lambda: calls.append('flush'))
+    with pytest.raises(SystemExit):
+        game.shutdown_handler(2, None)
+    assert calls == []
+    game.run_shutdown_hooks()
+    assert calls == ['flush']
+
+
+# --- Buffered Scoreboard ---
+def test_buffered_adds_are_written_before_other_writes(backend):
+    sb = Scoreboard(buffered=True, flush_interval=3600, backend=backend)
+    sb.add_score(Game.UNO, 'ann', 5)
+    sb.update_score(Game.UNO, 'ann', 2)
+    assert backend.fetch_scores('UNO') == [('ann', 7, 'A')]
+    assert sb.top_scores(Game.UNO) == [(1, 'ann', 7, 'A')]
+    sb.add_score(Game.UNO, 'bob', 1)
+    sb.clear_table(Game.UNO)
+    sb.flush()
+    assert backend.fetch_scores('UNO') == []
+    assert sb.top_scores(Game.UNO) == []